@@ -5,7 +5,6 @@ import matplotlib.pyplot as plt
 from streamlit_option_menu import option_menu
 from streamlit_extras.metric_cards import style_metric_cards
 import warnings
-from io import StringIO
 import boto3
 import datetime
 
@@ -34,7 +33,7 @@ st.markdown(
 class Dashboard:
     def __init__(self, data):
         self.data = data
-        self.df = pd.read_csv(StringIO(self.data))
+        self.df = pd.read_csv(self.data)
         self.df["created"] = pd.to_datetime(self.df["created"])
     def style_metric_cards(self, background_color="#333333", border_left_color="#444444", border_color="#555555", box_shadow="#000000"):
         st.markdown(
@@ -167,8 +166,7 @@ class Dashboard:
         # Load customer data from the customers.csv file
         s3_client = boto3.client('s3')
         response2 = s3_client.get_object(Bucket='braintaprawdata', Key='customers_6months.csv')
-        content2 = response2['Body'].read().decode('utf-8')
-        customers= pd.read_csv(StringIO(content2))
+        customers= pd.read_csv(response2['Body'])
 
         st.markdown(
                 """
@@ -313,10 +311,9 @@ class Dashboard:
         s3_client = boto3.client('s3')
         response1 = s3_client.get_object(Bucket='braintaprawdata', Key='subscriptions_6months.csv')
         response2= s3_client.get_object(Bucket='braintaprawdata', Key='customers_6months.csv')
-        content1 = response1['Body'].read().decode('utf-8')
-        content2 = response2['Body'].read().decode('utf-8')
-        df_sub = pd.read_csv(StringIO(content1))
-        df_cust =  pd.read_csv(StringIO(content2))
+        # Parse straight from the response streams, without a full-text copy
+        df_sub = pd.read_csv(response1['Body'])
+        df_cust =  pd.read_csv(response2['Body'])
 
         st.markdown(
                 """
@@ -399,8 +396,7 @@ class Dashboard:
     def payment(self):
         s3_client = boto3.client('s3')
         response = s3_client.get_object(Bucket='braintaprawdata', Key='both_success_fail.csv')
-        content = response['Body'].read().decode('utf-8')
-        payment_df = pd.read_csv(StringIO(content))
+        payment_df = pd.read_csv(response['Body'])
 
         st.markdown(
                 """
@@ -512,8 +508,7 @@ class Dashboard:
     def financial(self):
         s3_client = boto3.client('s3')
         response = s3_client.get_object(Bucket='braintaprawdata', Key='financial.csv')
-        content = response['Body'].read().decode('utf-8')
-        financial_df = pd.read_csv(StringIO(content))
+        financial_df = pd.read_csv(response['Body'])
         st.markdown(
                 """
                 <style>
@@ -597,8 +592,7 @@ class Dashboard:
 def main():
     s3_client = boto3.client('s3')
     response = s3_client.get_object(Bucket='braintaprawdata', Key='Untitled_report.csv')# Fetch the object from S3
-    content = response['Body'].read().decode('utf-8')# Read the content
-    dashboard = Dashboard(data=content)
+    dashboard = Dashboard(data=response['Body'])# Parse the streaming body directly
 
     with st.sidebar:
         selected = option_menu(
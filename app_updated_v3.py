@@ -1,19 +1,40 @@
 # Import the necessary libraries
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+import charts
 import matplotlib.pyplot as plt
 from streamlit_option_menu import option_menu
 import warnings
-from io import StringIO
-import boto3
-import datetime
+import os
 import seaborn as sns 
+from data_loader import DATASET_KEYS
+from dataset_store import DatasetStore
+from disk_mirror import DiskMirror
+from figure_cache import FigureCache
+from metric_graph import MetricExecutor
+from metrics import METRICS
+from page_cache import PageCache
+from progressive import render_blocks
+from rerun_trace import RerunTrace
+from rollups import build_financial_totals
+from table_pages import SortIndex, page_count, table_page
+from time_index import time_bounds
 
 
 # Disable all warnings, including deprecation warnings
 warnings.filterwarnings('ignore') 
 
+# Rows per page of the VIEW DATA tables; only the visible page is sent to the browser
+VIEW_PAGE_ROWS = 100
+
+# Threads computing a page's independent chart tasks while the script draws those already done (see
+# progressive.py and task_graph.py). One by default: the aggregations mostly hold the GIL, so more threads
+# have not been measured to help; DASHBOARD_RENDER_WORKERS raises it, 0 runs them in turn on the script thread
+RENDER_WORKERS = int(os.environ.get('DASHBOARD_RENDER_WORKERS', '1'))
+
+# Set DASHBOARD_RERUN_TRACE=1 to list the sections each rerun executed in the sidebar (they are always logged)
+SHOW_RERUN_TRACE = os.environ.get('DASHBOARD_RERUN_TRACE') == '1'
+
 # Set the Streamlit page configuration for the Dashboard with a wide layout and a chart icon
 st.set_page_config(page_title="Dashboard", page_icon=":chart_with_upwards_trend:", layout="wide")
 
@@ -70,32 +91,88 @@ def authenticate_user():
         st.button("Authenticate", on_click=creds_entered)
         return False
 class Dashboard:
-    def __init__(self,Revenue_df, customers_df, subscriptions_df, payment_df, financial_df):
+    def __init__(self,Revenue_df, customers_df, subscriptions_df, payment_df, financial_df, store=None,
+                 versions=None, page_cache=None, figure_cache=None, trace=None):
         self.Revenue_df = Revenue_df
         self.customers_df = customers_df
         self.subscriptions_df = subscriptions_df
         self.payment_df = payment_df
         self.financial_df = financial_df
+        self.store = store
+        # Versions of the datasets passed in, as served by the store
+        self.versions = versions
+        self.page_cache = page_cache
+        self.figure_cache = figure_cache
+        # Sections executed per rerun, for this session
+        self.trace = trace if trace is not None else RerunTrace()
+
+    def derived(self, name, key, build, df):
+        # Per-version value shared through the dataset store, or built directly without one
+        if self.store is None or self.versions is None:
+            return build(df)
+        return self.store.derived(name, key, build, df, self.versions[name])
+
+    def memoized(self, page, filters, compute):
+        # A page's computed results, shared by every session with the same data versions and filters
+        if self.page_cache is None or self.versions is None:
+            return compute()
+        return self.page_cache.get((page, tuple(sorted(self.versions.items())), filters), compute)
+
+    @st.fragment
+    def view_data(self, df, default, key, index=None, offset=0, display=None, **dataframe_args):
+        # A VIEW DATA table: columns picked by the user, sorted and cut into pages on the server.
+        # index is a SortIndex over the frame df is a slice of, starting at row offset.
+        # A fragment: its widgets rerun only this table, with the arguments of the last full run
+        with self.trace.fragment(f'{key}: VIEW DATA'):
+            self._view_data(df, default, key, index, offset, display, dataframe_args)
+
+    def _view_data(self, df, default, key, index, offset, display, dataframe_args):
+        showData = st.multiselect('Filter: ', df.columns, default=default)
+        sort_col, order_col, page_col = st.columns([2, 1, 1])
+        with sort_col:
+            sort_by = st.selectbox('Sort by', [None, *showData], format_func=lambda column: 'Date order' if column is None else column,
+                                   key=f'{key}_sort')
+        with order_col:
+            descending = st.toggle('Descending', key=f'{key}_descending')
+        pages = page_count(len(df), VIEW_PAGE_ROWS)
+        with page_col:
+            page = min(st.number_input(f'Page (of {pages:,})', min_value=1, value=1, step=1, key=f'{key}_page'), pages)
+        page_df = table_page(df, page - 1, VIEW_PAGE_ROWS, sort_by, not descending, index, offset)[showData]
+        if display is not None:
+            page_df = display(page_df)
+        st.dataframe(page_df, **dataframe_args)
+        first = (page - 1) * VIEW_PAGE_ROWS
+        st.caption(f"Rows {min(first + 1, len(df)):,}-{first + len(page_df):,} of {len(df):,}")
+
+    def metrics(self, **params):
+        # The metrics of metrics.py over this run's datasets and the page's parameters, shared with every
+        # page and session that needs them for the same data versions and parameters
+        datasets = {'revenue': self.Revenue_df, 'customers': self.customers_df, 'subscriptions': self.subscriptions_df,
+                    'payments': self.payment_df, 'financial': self.financial_df}
+        return MetricExecutor(METRICS, {**datasets, **params}, self.versions, self.page_cache, self.store)
+
+    def figure(self, name, data, build):
+        # A chart built from data (a frame, or a tuple of inputs), reused while that data is unchanged
+        if self.figure_cache is None:
+            return build()
+        return self.figure_cache.get(name, data, build)
     
     def Summary(self,Revenue_df, customers_df, subscriptions_df, payment_df, financial_df):
-        
-        # Assuming `Revenue_df` is your DataFrame with a 'created' column
-        Revenue_df['created'] = pd.to_datetime(Revenue_df['created'], errors='coerce')
-
-        # New users     - current day and last 7 days
-        today = Revenue_df['created'].dt.date.max()
-        last7days = today - datetime.timedelta(days=7)
-        last30days = today - datetime.timedelta(days=30)
-        new_users_today = Revenue_df[Revenue_df['created'].dt.date == today]['customer_id'].nunique()
-        new_users_last7days = Revenue_df[(Revenue_df['created'].dt.date >= last7days) & (Revenue_df['created'].dt.date < today)]['customer_id'].nunique()
-        new_users_last30days = Revenue_df[(Revenue_df['created'].dt.date >= last30days) & (Revenue_df['created'].dt.date < today)]['customer_id'].nunique()
-        st.subheader(today)
-        # New subscriptions - current day and last 7 days
-        last7days = today - datetime.timedelta(days=7)
-        last30days = today - datetime.timedelta(days=30)
-        new_sub_today = Revenue_df[Revenue_df['created'].dt.date == today]['subscription'].nunique()
-        new_sub_last7days = Revenue_df[(Revenue_df['created'].dt.date >= last7days) & (Revenue_df['created'].dt.date < today)]['subscription'].nunique()
-        new_sub_last30days = Revenue_df[(Revenue_df['created'].dt.date >= last30days) & (Revenue_df['created'].dt.date < today)]['subscription'].nunique()
+        self.trace.mark('Summary: data')
+        data = self.metrics().values([
+            'latest_day', 'new_users_today', 'new_users_last7days', 'new_users_last30days', 'new_sub_today',
+            'new_sub_last7days', 'new_sub_last30days', 'monthly_new_users', 'monthly_new_subscriptions', 'monthly_cancellations',
+        ])
+
+        self.trace.mark('Summary: KPI cards')
+        today = data['latest_day']
+        new_users_today = data['new_users_today']
+        new_users_last7days = data['new_users_last7days']
+        new_users_last30days = data['new_users_last30days']
+        st.subheader(today.date())
+        new_sub_today = data['new_sub_today']
+        new_sub_last7days = data['new_sub_last7days']
+        new_sub_last30days = data['new_sub_last30days']
 
         total1, total2 , total3 = st.columns(3, gap='small')
         with total1 :
@@ -123,59 +200,43 @@ class Dashboard:
             st.info('New Subscriptions in last 30 days')
             st.metric(label="New Subscriptions in last 30 days", value=f" {new_sub_last30days}")
         
-        # Ensure date columns are in datetime format
-        Revenue_df['created'] = pd.to_datetime(Revenue_df['created'])
-        # Extract month and year from creation dates
-        Revenue_df['month'] = Revenue_df['created'].dt.to_period('M').astype(str)
-        # Group by month and count new users and new subscriptions
-        monthly_new_users = Revenue_df.groupby('month').size().reset_index(name='new_users')
+        self.trace.mark('Summary: charts')
+        # New users by month
+        monthly_new_users = data['monthly_new_users']
         # Create bar charts
-        fig_users = px.bar(
+        fig_users = self.figure('summary_new_users', monthly_new_users, lambda: charts.bar(
             monthly_new_users,
             x='month',
             y='new_users',
-            title='New Users by Month'
-        )
-        fig_users.update_xaxes(type='category')
+            title='New Users by Month',
+            update_layout={'xaxis': {'type': 'category'}}
+        ))
         st.plotly_chart(fig_users)
 
         # New Subscriptions by Month bar chart 
-        # Convert the 'created' column to datetime format
-        subscriptions_df['created'] = pd.to_datetime(subscriptions_df['created'])
-        # Create a new column 'month' that contains the month of the 'created' column
-        subscriptions_df['month'] = subscriptions_df['created'].dt.to_period('M').astype(str)
-        # Group the data by 'month' and count the number of new subscriptions for each month
-        monthly_new_subscriptions = subscriptions_df.groupby('month').size().reset_index(name='new_subscriptions')
-        # Create a bar chart using Plotly Express
-        fig_subscriptions = px.bar(
+        # New subscriptions for each creation month
+        monthly_new_subscriptions = data['monthly_new_subscriptions']
+        # Create a bar chart, with the x-axis as a category
+        fig_subscriptions = self.figure('summary_new_subscriptions', monthly_new_subscriptions, lambda: charts.bar(
             monthly_new_subscriptions,
             x='month',
             y='new_subscriptions',
-            title='New Subscriptions by Month'
-        )
-        # Update the x-axis to be a category
-        fig_subscriptions.update_xaxes(type='category')
+            title='New Subscriptions by Month',
+            update_layout={'xaxis': {'type': 'category'}}
+        ))
         # Display the bar charts using Streamlit
         st.plotly_chart(fig_subscriptions)
         
         # Monthly Subscription Cancellations bar chart
-        # Ensure created column is in datetime format
-        subscriptions_df['created'] = pd.to_datetime(subscriptions_df['created'], errors='coerce')
-        # Ensure canceled_at column is in datetime format
-        subscriptions_df['canceled_at'] = pd.to_datetime(subscriptions_df['canceled_at'])
-        # Extract month and year from cancellation date
-        subscriptions_df['month'] = subscriptions_df['canceled_at'].dt.to_period('M').astype(str)
-        # Group by month and count cancellations
-        monthly_cancellations = subscriptions_df.groupby('month').size().reset_index(name='cancellations')
-        # Filter for y-axis data under 1500
-        monthly_cancellations = monthly_cancellations[monthly_cancellations['cancellations'] < 1500]
+        # Cancellations per cancellation month, under 1500
+        monthly_cancellations = data['monthly_cancellations']
         # Create a bar chart
-        fig = px.bar(
+        fig = self.figure('summary_cancellations', monthly_cancellations, lambda: charts.bar(
             monthly_cancellations, 
             x='month', 
             y='cancellations', 
             title='Monthly Subscription Cancellations'
-        )
+        ))
         st.plotly_chart(fig)
 
     def Revenue(self,Revenue_df):
@@ -195,7 +256,6 @@ class Dashboard:
         # Sidebar
         st.sidebar.header("Select Date Range:")
         # Get the start date and end date from the sidebar
-        Revenue_df['created'] = pd.to_datetime( Revenue_df['created'], errors='coerce')
         start_date = st.sidebar.date_input("Start date", Revenue_df["created"].min())
         end_date = st.sidebar.date_input("End date", Revenue_df["created"].max())
 
@@ -203,23 +263,17 @@ class Dashboard:
         start_date = pd.to_datetime(start_date)
         end_date = pd.to_datetime(end_date)
 
-        # Filter the dataframe based on the start date and end date
-        filtered_df = Revenue_df.query("created >= @start_date and created <= @end_date")
-
-        # 1. Total Transaction Amount (sum of all invoice amounts)
-        total_transaction_amount = filtered_df['total_invoice_amount'].sum()
-
-        # 2. Total Subscription Amount (assuming 'subscription' keyword in description)
-        subscription_df = filtered_df[filtered_df['description'].str.contains('subscription', case=False, na=False)]
-        total_subscription_amount = subscription_df['total_invoice_amount'].sum()
-
-        # 3. Total Products Amount (rows where 'description' does NOT contain 'subscription')
-        product_df = filtered_df[~filtered_df['description'].str.contains('subscription', case=False, na=False)]
-        total_product_amount = product_df['total_invoice_amount'].sum()
-
-        # 4. Tax Amount (assuming 'tax_info_type' provides relevant details)
-        tax_amount = filtered_df['tax'].sum()  # Adjust this to the actual tax column
-
+        self.trace.mark('Revenue: data')
+        metrics = self.metrics(start_date=start_date, end_date=end_date)
+        data = metrics.values(['filtered_revenue', 'revenue_bounds', 'total_transaction_amount', 'total_subscription_amount',
+                               'total_product_amount', 'tax_amount'])
+        filtered_df = data['filtered_revenue']
+        total_transaction_amount = data['total_transaction_amount']
+        total_subscription_amount = data['total_subscription_amount']
+        total_product_amount = data['total_product_amount']
+        tax_amount = data['tax_amount']
+
+        self.trace.mark('Revenue: KPI cards')
         # Display metrics for all required amounts
         total1, total2  = st.columns(2, gap='small')
         with total1 :
@@ -236,217 +290,111 @@ class Dashboard:
         with total2:
             st.info('Total Tax', icon="💰") 
             st.metric(label="Total Tax Amount", value=f"$ {tax_amount:,.2f}")
+        self.trace.milestone('first metric')
 
         with st.expander("VIEW DATA"):
-            showData = st.multiselect('Filter: ', filtered_df.columns, default=[
+            # Sorted with column orders of the whole dataset, built once per data version
+            self.view_data(filtered_df, [
                 'created', 'customer_id', 'email', 'phone', 'name',  'subscription', 'invoice_number',
                 'description', 'quantity', 'currency', 'line_item_amount',
                 'total_invoice_amount', 'discount', 'fee', 'tax', 'net_amount'
-            ])
-            st.dataframe(filtered_df[showData])
-
-        # GEAPH 1 
-        filtered_df['year_month'] = filtered_df['created'].dt.to_period('M')
-        monthly_net_amount = filtered_df.groupby('year_month')['net_amount'].sum().reset_index() # Group the filtered dataframe by year_month and sum the net_amount column
-        monthly_net_amount['year_month'] = monthly_net_amount['year_month'].astype(str) # Convert the year_month column to string type
-        fig_1 = px.bar(monthly_net_amount, x='year_month', y='net_amount', title="Total Net Amount by Month",
-                    labels={'year_month': 'Month', 'net_amount': 'Total Net Amount ($)'})# Create a bar plot using the Plotly Express library
-        
-        # GEAPH 2  
-        monthly_tax = filtered_df.groupby('year_month')['tax'].sum().reset_index() # Group the filtered dataframe by year_month and sum the tax values
-        monthly_tax['year_month'] = monthly_tax['year_month'].astype(str) # Convert the year_month column to string type
-        fig_2 = px.bar(monthly_tax, x='tax', y='year_month', title="Total Tax by Month",
-            labels={'year_month': 'Month', 'tax': 'Total Tax ($)'}) # Create a pie chart using the monthly_tax dataframe, with the tax values as the values, the year_month as the names, and the title as "Total Tax by Month"
-
+            ], 'Revenue', index=self.derived('revenue', 'sort_index', SortIndex, Revenue_df), offset=data['revenue_bounds'][0])
 
+        self.trace.mark('Revenue: charts')
+        # A slot per chart, laid out now and filled as each chart's data and figure are ready
         total1, total2 = st.columns(2, gap='small')
         with total1:
-            st.plotly_chart(fig_1)
-
+            net_amount_slot = st.empty()
         with total2:
-            st.plotly_chart(fig_2)
-
-        # Graph 3
-        filtered_df['total_invoice_amount'] = filtered_df['total_invoice_amount'].astype(int)# Convert the 'total_invoice_amount' column to integer type
-        top_customers = filtered_df.groupby('email')['total_invoice_amount'].sum().reset_index()# Group the data by 'customer_id' and sum the 'total_invoice_amount' for each customer
-        top_customers = top_customers.sort_values(by='total_invoice_amount', ascending=False).head(5)# Sort the data by 'total_invoice_amount' in descending order and select the top 10 customers
-        fig_3 = px.pie(top_customers, names='email', values='total_invoice_amount', title='Top 5 Customers by Revenue')# Create a pie chart using Plotly Express with 'customer_id' on the x-axis and 'total_invoice_amount' on the y-axis
-
-        # Graph 4
-        revenue_by_product = product_df.groupby('description')['total_invoice_amount'].sum().reset_index() # Group the data by 'description' and sum the 'total_invoice_amount' for each product
-        top_revenue_by_product = revenue_by_product.sort_values(by='total_invoice_amount', ascending=False).head(5) # Sort the values and get the top 10
-        fig_4 = px.pie(top_revenue_by_product, values='total_invoice_amount', names='description', title='Top 5 Products by Revenue') # Create the pie chart visualization
-
-        total1 ,total2 = st.columns(2, gap='small')
+            tax_slot = st.empty()
+        total1, total2 = st.columns(2, gap='small')
         with total1:
-            st.plotly_chart(fig_3)
-
-            with st.expander("VIEW DATA"): # Create an expander to display the data
-                st.dataframe(top_customers)  # Display the top customers dataframe
-
+            top_customers_slot = st.empty()
         with total2:
-            st.plotly_chart(fig_4, use_container_width=True)
-
-            with st.expander("VIEW DATA"):
-                st.dataframe(top_revenue_by_product)
-        
-        # Graph 5
-        filtered_df['month'] = filtered_df['created'].dt.strftime('%Y-%m') # Convert the 'created' column to a string in the format 'YYYY-MM'
-        tax_fee = filtered_df.groupby('month').agg({'tax': 'sum', 'fee': 'sum'}).reset_index() # Group the data by month and sum the 'tax' and 'fee' columns
-        fig_5 = px.bar(tax_fee, x='month', y=['tax', 'fee'], title='Tax and Fee Analysis Over Time', labels={'month': 'Month'}) # Create a bar chart with the 'month' on the x-axis and 'tax' and 'fee' on the y-axis
-        fig_5.update_xaxes(type='category') # Ensure the x-axis is treated as categorical
-        st.plotly_chart(fig_5)
-
-        with st.expander("VIEW DATA"):
-            st.dataframe(tax_fee)
+            top_products_slot = st.empty()
+        tax_fee_slot = st.empty()
+        subscription_slot = st.empty()
+        total1, total2 = st.columns(2, gap='small')
+        with total1:
+            transaction_trend_slot = st.empty()
+        with total2:
+            subscription_trend_slot = st.empty()
+        total1, total2 = st.columns(2, gap='small')
+        with total1:
+            product_trend_slot = st.empty()
+        with total2:
+            tax_trend_slot = st.empty()
 
-        # Graph 6
-        subscription_analysis = filtered_df['subscription'].value_counts().reset_index() # Create a dataframe with the count of each subscription type
-        subscription_analysis.columns = ['Subscription', 'Count'] # Rename the columns of the dataframe
-        fig_6 = px.bar(subscription_analysis, x='Subscription', y='Count', title='Revenue by Subscription') # Create a bar chart with the subscription type on the x-axis and the count on the y-axis
-        st.plotly_chart(fig_6)
+        # The charts' data computed at the same time, each memoized per date range
+        graph = metrics.graph([
+            'monthly_net_amount', 'monthly_tax', 'top_customers', 'top_revenue_by_product', 'tax_fee', 'subscription_analysis',
+            'monthly_transaction', 'monthly_subscription', 'monthly_product', 'monthly_tax_trend',
+        ])
 
-        with st.expander("VIEW DATA"):
-            st.dataframe(subscription_analysis)
+        def chart(name, build):
+            # The chart's figure: one more task, after its data; the block shows both
+            graph.add(f'{name} figure', lambda df: (df, self.figure(f'revenue_{name}', df, lambda: build(df))), name)
+            return f'{name} figure'
 
-        Revenue_df['created'] = pd.to_datetime(Revenue_df['created'], errors='coerce')
-        # Drop rows where 'created' is NaT (not a time)
-        Revenue_df = Revenue_df.dropna(subset=['created'])
-        # Extract year and month from the 'created' column for grouping
-        Revenue_df['year'] = Revenue_df['created'].dt.year
-        # Month names (January, February, etc.)
-        Revenue_df['month'] = Revenue_df['created'].dt.strftime('%B')  
+        def show(result, **chart_args):
+            st.plotly_chart(result[1], **chart_args)
 
-        total1,total2 = st.columns(2, gap='small')
-        with total1:
-            # Total Transaction Amount by Month
-            monthly_transaction = Revenue_df.groupby(['year', 'month'])['total_invoice_amount'].sum().reset_index()
-            # Calculate the percentage change
-            monthly_transaction['percent_change'] = monthly_transaction['total_invoice_amount'].pct_change() * 100
-            # Create a figure with bar and line charts
-            fig = px.bar(
-                monthly_transaction,
-                x='month',
-                y='total_invoice_amount',
-                title="Total Transaction Amount by Month",
-                labels={'total_invoice_amount': 'Total Transaction Amount ($)'}
-            )
-            # Add a trend line showing percentage change
-            fig.add_scatter(
-                x=monthly_transaction['month'],
-                y=monthly_transaction['total_invoice_amount'],
-                mode='lines+markers',
-                name='Trend',
-                hovertext=monthly_transaction['percent_change'].apply(lambda x: f'{x:.2f}%' if pd.notnull(x) else ''),
-                hoverinfo='text'
-            )
-            fig.update_layout(
-                xaxis_title='Month',
-                yaxis_title='Total Transaction Amount ($)',
-                xaxis={'categoryorder': 'category ascending'},
-                template='plotly_white'
-            )
-            # Display the plot
-            st.plotly_chart(fig)
-
-        with total2:
-            # Filter where 'description' contains 'subscription'
-            subscription_df = Revenue_df[Revenue_df['description'].str.contains('subscription', case=False, na=False)]
-            # Total Subscription Amount by Month
-            monthly_subscription = subscription_df.groupby(['year', 'month'])['total_invoice_amount'].sum().reset_index()
-            # Calculate the percentage change
-            monthly_subscription['percent_change'] = monthly_subscription['total_invoice_amount'].pct_change() * 100
-            # Create a figure with bar and line charts
-            fig2 = px.bar(
-                monthly_subscription,
-                x='month',
-                y='total_invoice_amount',
-                title="Total Subscription Amount by Month",
-                labels={'total_invoice_amount': 'Total Subscription Amount ($)'}
-            )
-            # Add a trend line showing percentage change
-            fig2.add_scatter(
-                x=monthly_subscription['month'],
-                y=monthly_subscription['total_invoice_amount'],
-                mode='lines+markers',
-                name='Trend',
-                hovertext=monthly_subscription['percent_change'].apply(lambda x: f'{x:.2f}%' if pd.notnull(x) else ''),
-                hoverinfo='text'
-            )
-            fig2.update_layout(
-                xaxis_title='Month',
-                yaxis_title='Total Subscription Amount ($)',
-                xaxis={'categoryorder': 'category ascending'},
-                template='plotly_white'
-            )
-            # Display the plot
-            st.plotly_chart(fig2)
-
-        total1,total2 = st.columns(2, gap='small')
+        def show_with_data(result, **chart_args):
+            df, fig = result
+            st.plotly_chart(fig, **chart_args)
+            with st.expander("VIEW DATA"): # Create an expander to display the data
+                st.dataframe(df)
 
-        with total1:
-            # Filter where 'description' does not contain 'subscription'
-            product_df = Revenue_df[~Revenue_df['description'].str.contains('subscription', case=False, na=False)]
-            # Total Products Amount by Month
-            monthly_product = product_df.groupby(['year', 'month'])['total_invoice_amount'].sum().reset_index()
-            # Calculate the percentage change
-            monthly_product['percent_change'] = monthly_product['total_invoice_amount'].pct_change() * 100
-            # Create a figure with bar and line charts
-            fig3 = px.bar(
-                monthly_product,
+        def trend_chart(measure, title, axis_title):
+            # Bar chart with a trend line showing the percentage change
+            return lambda df: charts.trend_bar(
+                df,
                 x='month',
-                y='total_invoice_amount',
-                title="Total Product Amount by Month",
-                labels={'total_invoice_amount': 'Total Product Amount ($)'}
-            )
-            # Add a trend line showing percentage change
-            fig3.add_scatter(
-                x=monthly_product['month'],
-                y=monthly_product['total_invoice_amount'],
-                mode='lines+markers',
-                name='Trend',
-                hovertext=monthly_product['percent_change'].apply(lambda x: f'{x:.2f}%' if pd.notnull(x) else ''),
-                hoverinfo='text'
-            )
-            fig3.update_layout(
-                xaxis_title='Month',
-                yaxis_title='Total Product Amount ($)',
-                xaxis={'categoryorder': 'category ascending'},
-                template='plotly_white'
+                y=measure,
+                title=title,
+                labels={measure: axis_title},
+                hovertext=df['percent_change'].apply(lambda x: f'{x:.2f}%' if pd.notnull(x) else ''),
+                update_layout={
+                    'xaxis': {'title': {'text': 'Month'}, 'categoryorder': 'trace'},
+                    'yaxis': {'title': {'text': axis_title}},
+                    'template': 'plotly_white'
+                }
             )
-            # Display the plot
-            st.plotly_chart(fig3)
 
-        with total2:
-            # Total Tax Amount by Month
-            monthly_tax = Revenue_df.groupby(['year', 'month'])['tax'].sum().reset_index()
-            # Calculate the percentage change
-            monthly_tax['percent_change'] = monthly_tax['tax'].pct_change() * 100
-            # Create a figure with bar and line charts
-            fig4 = px.bar(
-                monthly_tax,
-                x='month',
-                y='tax',
-                title="Total Tax Amount by Month",
-                labels={'tax': 'Tax Amount ($)'}
-            )
-            # Add a trend line showing percentage change
-            fig4.add_scatter(
-                x=monthly_tax['month'],
-                y=monthly_tax['tax'],
-                mode='lines+markers',
-                name='Trend',
-                hovertext=monthly_tax['percent_change'].apply(lambda x: f'{x:.2f}%' if pd.notnull(x) else ''),
-                hoverinfo='text'
-            )
-            fig4.update_layout(
-                xaxis_title='Month',
-                yaxis_title='Tax Amount ($)',
-                xaxis={'categoryorder': 'category ascending'},
-                template='plotly_white'
-            )
-            # Display the plot
-            st.plotly_chart(fig4)
+        render_blocks(graph, [
+            # GEAPH 1: net amount per 'YYYY-MM' month of the selected range
+            (net_amount_slot, chart('monthly_net_amount', lambda df: charts.bar(df, x='year_month', y='net_amount', title="Total Net Amount by Month",
+                labels={'year_month': 'Month', 'net_amount': 'Total Net Amount ($)'})), show),
+            # GEAPH 2: a horizontal bar chart with the tax values along the x-axis, one bar per year_month
+            (tax_slot, chart('monthly_tax', lambda df: charts.bar(df, x='tax', y='year_month', title="Total Tax by Month",
+                labels={'year_month': 'Month', 'tax': 'Total Tax ($)'}, orientation='h')), show),
+            # Graph 3: a slice per customer email sized by 'total_invoice_amount'
+            (top_customers_slot, chart('top_customers', lambda df: charts.pie(df, names='email', values='total_invoice_amount',
+                title='Top 5 Customers by Revenue')), show_with_data),
+            # Graph 4: top 5 products by invoice amount
+            (top_products_slot, chart('top_revenue_by_product', lambda df: charts.pie(df, values='total_invoice_amount', names='description',
+                title='Top 5 Products by Revenue')), lambda result: show_with_data(result, use_container_width=True)),
+            # Graph 5: 'tax' and 'fee' per month of the selected range, the x-axis treated as categorical
+            (tax_fee_slot, chart('tax_fee', lambda df: charts.bar(
+                df, x='month', y=['tax', 'fee'], title='Tax and Fee Analysis Over Time', labels={'month': 'Month'},
+                update_layout={'xaxis': {'type': 'category'}}
+            )), show_with_data),
+            # Graph 6: line items per subscription type
+            (subscription_slot, chart('subscription_analysis', lambda df: charts.bar(df, x='Subscription', y='Count',
+                title='Revenue by Subscription')), show_with_data),
+            # Total Transaction Amount by Month, with the percentage change
+            (transaction_trend_slot, chart('monthly_transaction', trend_chart('total_invoice_amount', "Total Transaction Amount by Month",
+                'Total Transaction Amount ($)')), show),
+            # Total Subscription Amount by Month (descriptions containing 'subscription'), with the percentage change
+            (subscription_trend_slot, chart('monthly_subscription', trend_chart('total_invoice_amount', "Total Subscription Amount by Month",
+                'Total Subscription Amount ($)')), show),
+            # Total Products Amount by Month (descriptions not containing 'subscription'), with the percentage change
+            (product_trend_slot, chart('monthly_product', trend_chart('total_invoice_amount', "Total Product Amount by Month",
+                'Total Product Amount ($)')), show),
+            # Total Tax Amount by Month, with the percentage change
+            (tax_trend_slot, chart('monthly_tax_trend', trend_chart('tax', "Total Tax Amount by Month", 'Tax Amount ($)')), show),
+        ], workers=RENDER_WORKERS)
+        self.trace.milestone('complete')
 
     def Customers(self,customers_df,subscriptions_df):
         # Use Streamlit's markdown function to add a style tag to hide the Streamlit element toolbar
@@ -461,10 +409,6 @@ class Dashboard:
                 unsafe_allow_html=True
             )
 
-        # Convert 'trial_end' and 'created' to datetime
-        subscriptions_df['trial_end'] = pd.to_datetime(subscriptions_df['trial_end'])
-        subscriptions_df['created'] = pd.to_datetime(subscriptions_df['created'])
-
         # Sidebar filter for date range
         st.sidebar.header("Select Date Range:")
         start_date = st.sidebar.date_input("Start date", subscriptions_df['created'].min().date())
@@ -472,19 +416,18 @@ class Dashboard:
         start_date = pd.to_datetime(start_date)
         end_date = pd.to_datetime(end_date)
 
-        # Filter the subscription data
-        filtered_sub_df = subscriptions_df[(subscriptions_df["trial_end"] >= start_date) & (subscriptions_df["trial_end"] <= end_date)]
-        filtered_cust_sub_df = filtered_sub_df.merge(customers_df, left_on="customer_id", right_on="id", how="inner")
-        # Filter data
-        customers_df['created'] = pd.to_datetime(customers_df['created'], errors='coerce')
-        filtered_df = customers_df[(customers_df['created'] >= pd.to_datetime(start_date)) & (customers_df['created'] <= pd.to_datetime(end_date))]
-
-
-        # Calculate the total number of active, inactive, trialing, past due, paused, and incomplete expired subscriptions
-        total_active = filtered_cust_sub_df[filtered_cust_sub_df["status"] == "active"].shape[0] # Calculate the total number of active customers
-        total_inactive = filtered_cust_sub_df[filtered_cust_sub_df["status"] != "active"].shape[0] # Calculate the total number of inactive customers
-        total_trialing = filtered_cust_sub_df[filtered_cust_sub_df["status"] == "trialing"].shape[0] # Calculate the total number of trialing customers
-
+        self.trace.mark('Customers: data')
+        # The sign-up trend counts back from today, so the day is part of the filters
+        today = pd.Timestamp.today().normalize()
+        data = self.metrics(start_date=start_date, end_date=end_date, today=today).values([
+            'active_customers', 'inactive_customers', 'trialing_customers', 'monthly_new_customers', 'df_sign_up_data',
+            'top_cities', 'city_counts', 'country_counts',
+        ])
+        total_active = data['active_customers']
+        total_inactive = data['inactive_customers']
+        total_trialing = data['trialing_customers']
+
+        self.trace.mark('Customers: KPI cards')
         total_customers = total_active + total_inactive + total_trialing
         total1 , total2  = st.columns(2)
         with total1:
@@ -503,88 +446,49 @@ class Dashboard:
             st.info('Trialing Customers')
             st.metric(label="Trialing Customers", value=f" {total_trialing:,.0f}")
 
+        self.trace.mark('Customers: charts')
         #Graph 1
-        filtered_df['created'] = pd.to_datetime(filtered_df['created']) # Convert 'created' to datetime if it's not already
-        current_date = pd.to_datetime("today") # Filter data for the last 6 months
-        start_date = current_date - pd.DateOffset(months=6)
-        filtered_customers = filtered_df[filtered_df['created'] >= start_date]
-        filtered_customers.set_index('created', inplace=True) # Group by month and count new customers
-        monthly_new_customers = filtered_customers.resample('M').size().reset_index(name='new_customers_count')
-        monthly_new_customers['year_month'] = monthly_new_customers['created'].dt.strftime('%Y-%m') # Correctly align data with the months
-        monthly_new_customers = monthly_new_customers.sort_values(by='created', ascending=True) # Sort by 'year_month' in ascending order
+        monthly_new_customers = data['monthly_new_customers']
         st.subheader('New Customer Sign-Up Trend')
         # Plot the data
-        fig = px.bar(
+        fig = self.figure('customers_sign_ups', monthly_new_customers, lambda: charts.bar(
             monthly_new_customers,
             x='year_month',
             y='new_customers_count',
             title="New Customer Sign-Ups by Month",
             width=1200,
             height=400,
-            color_discrete_sequence=['#636EFA']
-        )
-
-        fig.update_layout(
-            xaxis_title='Month',
-            yaxis_title='New Customers Count',
-            barmode='group',
-            bargap=0.15,
-            bargroupgap=0.1
-        )
+            color_discrete_sequence=['#636EFA'],
+            update_layout={
+                'xaxis': {'title': {'text': 'Month'}},
+                'yaxis': {'title': {'text': 'New Customers Count'}},
+                'barmode': 'group',
+                'bargap': 0.15,
+                'bargroupgap': 0.1
+            }
+        ))
 
         st.plotly_chart(fig)
         
         #Graph 2
-        # Filter data for the last 6 months
-        df_sign_up = filtered_df[["id", "created"]]
-        df_sign_up["created"] = pd.to_datetime(df_sign_up["created"])
-        df_sign_up["Month_year"] = df_sign_up["created"].dt.strftime('%Y-%m')
-        df_sign_up = df_sign_up[["id", "Month_year"]]
-        df_sign_up["Cust_count_month"] = df_sign_up.groupby("Month_year")["id"].transform('count')
-        df_sign_up_data = df_sign_up[["Month_year", "Cust_count_month"]]
-        df_sign_up_data = df_sign_up_data.drop_duplicates()
-        df_sign_up_data = df_sign_up_data.sort_values(by=['Month_year'], ascending=False)
-        df_sign_up_data.reset_index(drop=True, inplace=True)
         with st.expander("VIEW DATA"):
-            st.dataframe(df_sign_up_data) #, use_container_width=True
-                
-        #Graph 2
-        # Filter data for the last 6 months
-        df_sign_up = filtered_df[["id", "created"]]
-        df_sign_up["created"] = pd.to_datetime(df_sign_up["created"])
-        df_sign_up["Month_year"] = df_sign_up["created"].dt.strftime('%Y-%m')
-        df_sign_up = df_sign_up[["id", "Month_year"]]
-        df_sign_up["Cust_count_month"] = df_sign_up.groupby("Month_year")["id"].transform('count')
-        df_sign_up_data = df_sign_up[["Month_year", "Cust_count_month"]]
-        df_sign_up_data = df_sign_up_data.drop_duplicates()
-        df_sign_up_data = df_sign_up_data.sort_values(by=['Month_year'], ascending=False)
-        df_sign_up_data.reset_index(drop=True, inplace=True)
-        # with st.expander("VIEW DATA"):
-        #     st.dataframe(df_sign_up_data) #, use_container_width=True
-                
-    
-        geo_data = filtered_df[['shipping_address_city', 'shipping_address_country']].dropna()
-        city_counts = geo_data['shipping_address_city'].value_counts().reset_index()
-        city_counts.columns = ['City', 'Count']
+            st.dataframe(data['df_sign_up_data']) #, use_container_width=True
 
-        fig = px.bar(city_counts.head(10), x='City', y='Count', title='Top 10 Cities by Customer Count')
+        top_cities = data['top_cities']
+        fig = self.figure('customers_top_cities', top_cities, lambda: charts.bar(top_cities, x='City', y='Count', title='Top 10 Cities by Customer Count'))
         st.plotly_chart(fig)
 
         #Graph 3
         # Display an interactive table
-        city_counts = filtered_df['shipping_address_city'].value_counts().reset_index()
-        city_counts.columns = ['City', 'Count']
         with st.expander("VIEW DATA"):
-            st.dataframe(city_counts)
-
-        # Prepare data for the donut chart
-        country_counts = filtered_df['shipping_address_country'].value_counts().reset_index()
-        country_counts.columns = ['Country', 'Count']
-
-        fig = px.pie(country_counts.head(5), values='Count', names='Country', title='Top 5 Countries by Customer Count', hole=0.4)
-
-        fig.update_traces(textinfo='percent+label')
-        fig.update_layout(annotations=[dict(text='Countries', x=0.5, y=0.5, font_size=20, showarrow=False)])
+            st.dataframe(data['city_counts'])
+
+        top_countries = data['country_counts'].head(5)
+        fig = self.figure('customers_top_countries', top_countries, lambda: charts.pie(
+            top_countries, values='Count', names='Country', title='Top 5 Countries by Customer Count', hole=0.4,
+            update_traces={'textinfo': 'percent+label'},
+            update_layout={'annotations': [dict(text='Countries', x=0.5, y=0.5, font={'size': 20}, showarrow=False)]}
+        ))
         st.plotly_chart(fig)
 
     def Subscriptions(self,subscriptions_df,customers_df,revenue_df):
@@ -599,11 +503,6 @@ class Dashboard:
                 unsafe_allow_html=True
             )
 
-        # Convert 'trial_end' and 'created' to datetime
-        subscriptions_df['trial_end'] = pd.to_datetime(subscriptions_df['trial_end'])
-        subscriptions_df['created'] = pd.to_datetime(subscriptions_df['created'])
-        revenue_df['created'] = pd.to_datetime(revenue_df['created'])
-
         # Sidebar filter for date range
         st.sidebar.header("Select Date Range:")
         start_date = st.sidebar.date_input("Start date", subscriptions_df['created'].min().date())
@@ -613,19 +512,23 @@ class Dashboard:
         
         
 
-        # Filter the subscription data
-        filtered_sub_df = subscriptions_df[(subscriptions_df["trial_end"] >= start_date) & (subscriptions_df["trial_end"] <= end_date)]
-        filtered_cust_sub_df = filtered_sub_df.merge(customers_df, left_on="customer_id", right_on="id", how="inner")
-
-        # Calculate the total number of active, inactive, trialing, past due, paused, and incomplete expired subscriptions
-        total_active = filtered_sub_df[filtered_sub_df["status"] == "active"].shape[0] # Calculate the total number of active customers
-        total_inactive = filtered_sub_df[filtered_sub_df["status"] != "active"].shape[0] # Calculate the total number of inactive customers
-        total_trialing = filtered_sub_df[filtered_sub_df["status"] == "trialing"].shape[0] # Calculate the total number of trialing customers
-        total_past_due = filtered_sub_df[filtered_sub_df["status"] == "past_due"].shape[0] # Calculate the total number of past due customers
-        total_paused = filtered_sub_df[filtered_sub_df["status"] == "paused"].shape[0] # Calculate the total number of paused customers
-        total_incomplete_expired = subscriptions_df[subscriptions_df["status"] == "incomplete_expired"].shape[0] # Calculate the total number of incomplete expired subscriptions
+        self.trace.mark('Subscriptions: data')
+        # The subscriptions joined to their customers are a slice of a join shared with the Customers page
+        data = self.metrics(start_date=start_date, end_date=end_date).values([
+            'customer_subscriptions', 'customer_subscriptions_bounds', 'customer_subscriptions_index', 'active_subscriptions', 'inactive_subscriptions',
+            'trialing_subscriptions', 'past_due_subscriptions', 'paused_subscriptions', 'incomplete_expired_subscriptions',
+            'monthly_active_subs', 'daily_active_subs', 'customer_trials', 'df_multiple_trials', 'status_trend', 'subscription_trend',
+        ])
+        filtered_cust_sub_df = data['customer_subscriptions']
+        total_active = data['active_subscriptions']
+        total_inactive = data['inactive_subscriptions']
+        total_trialing = data['trialing_subscriptions']
+        total_past_due = data['past_due_subscriptions']
+        total_paused = data['paused_subscriptions']
+        total_incomplete_expired = data['incomplete_expired_subscriptions']
         
 
+        self.trace.mark('Subscriptions: KPI cards')
         # Create columns in Streamlit
         total1, total2, total3 = st.columns(3, gap='small')
 
@@ -660,46 +563,45 @@ class Dashboard:
 
         # Display upcoming subscription end customers
         st.subheader("Upcoming Subscription End Customers")
+        def trial_dates(view_df):
+            # Show trial dates without the time part, on the displayed page only
+            for column in {"trial_start", "trial_end"}.intersection(view_df.columns):
+                view_df = view_df.assign(**{column: view_df[column].dt.date})
+            return view_df
         with st.expander("VIEW DATA"):
-            filtered_cust_sub_df['trial_start'] = pd.to_datetime(filtered_cust_sub_df['trial_start']).dt.date
-            filtered_cust_sub_df['trial_end'] = pd.to_datetime(filtered_cust_sub_df['trial_end']).dt.date
-            showData = st.multiselect('Filter: ', filtered_cust_sub_df.columns, default=[
-                "name", "phone", "email", "trial_start","trial_end"])
-            st.dataframe(filtered_cust_sub_df[showData], use_container_width=True) 
+            self.view_data(filtered_cust_sub_df, ["name", "phone", "email", "trial_start","trial_end"], 'Subscriptions',
+                           index=data['customer_subscriptions_index'], offset=data['customer_subscriptions_bounds'][0],
+                           display=trial_dates, use_container_width=True)
 
 
+        self.trace.mark('Subscriptions: charts')
         # Graph 2
         # Monthly Active Subscriptions
-        filtered_sub_df["month"] = filtered_sub_df["created"].dt.to_period('M').astype(str)
-        monthly_active_subs = filtered_sub_df.groupby("month")["customer_id"].count().reset_index()
-        fig_monthly_2 = px.bar(monthly_active_subs, x="month", y="customer_id", title="Monthly Active Subscriptions")
+        monthly_active_subs = data['monthly_active_subs']
+        fig_monthly_2 = self.figure('subscriptions_monthly_active', monthly_active_subs, lambda: charts.bar(monthly_active_subs, x="month", y="customer_id", title="Monthly Active Subscriptions"))
         st.plotly_chart(fig_monthly_2)
 
         # Graph 3
         # Daily Active Subscriptions
-        filtered_sub_df = filtered_sub_df[filtered_sub_df["status"] == "active"] # Filter the dataframe to only include rows where the subscription status is active
-        filtered_sub_df["day"] = filtered_sub_df["created"].dt.strftime('%Y-%m-%d') # Create a new column in the dataframe that contains the date of the subscription creation
-        daily_active_subs = filtered_sub_df.groupby("day")["customer_id"].count().reset_index() # Group the dataframe by the date of subscription creation and count the number of unique customer IDs for each date
-        fig_daily_3 = px.bar(daily_active_subs, x="day", y="customer_id", title="Daily Active Subscriptions") # Create a bar chart using Plotly Express to display the number of active subscriptions for each date
-        fig_daily_3.update_layout(
-            xaxis_title='Date',
-            yaxis_title='Number of Active Subscriptions',
-            xaxis_tickformat='%Y-%m-%d'
-        ) # Update the layout of the bar chart to include titles for the x and y axes and format the x-axis tick labels
+        daily_active_subs = data['daily_active_subs'] # Active subscriptions per creation day
+        # Create a bar chart of the number of active subscriptions for each date, with titles for the x and y axes and formatted x-axis tick labels
+        fig_daily_3 = self.figure('subscriptions_daily_active', daily_active_subs, lambda: charts.bar(
+            daily_active_subs, x="day", y="customer_id", title="Daily Active Subscriptions",
+            update_layout={
+                'xaxis': {'title': {'text': 'Date'}, 'tickformat': '%Y-%m-%d'},
+                'yaxis': {'title': {'text': 'Number of Active Subscriptions'}}
+            }
+        ))
         st.plotly_chart(fig_daily_3)
 
-        # Filter the data for the specific customer_id
-        filtered_sub_df['trial_start'] = pd.to_datetime(filtered_sub_df['trial_start']).dt.date
-        filtered_sub_df['trial_end'] = pd.to_datetime(filtered_sub_df['trial_end']).dt.date
-        filtered_sub_df[filtered_sub_df["customer_id"]=="cus_OzTLZG52Io2Izb"][["customer_id","trial_start","trial_end","status"]].sort_values(by=["trial_start"])
+        # Trials of the specific customer_id
+        customer_trials = data['customer_trials']
         with st.expander("VIEW DATA"):
-            st.dataframe(filtered_sub_df[filtered_sub_df["customer_id"]=="cus_OzTLZG52Io2Izb"][["customer_id","trial_start","trial_end","status"]].sort_values(by=["trial_start"]), use_container_width=True)
+            st.dataframe(customer_trials, use_container_width=True)
 
         # Graph 4   
-        # Count the number of times each customer has used the trial
-        df_trial_counts = filtered_cust_sub_df["email"].value_counts().reset_index()
-        df_trial_counts.columns = ['email', 'trial_count']
-        df_multiple_trials = df_trial_counts[df_trial_counts['trial_count'] > 1] # Filter customers who have used the trial multiple times (e.g., more than once)
+        # Customers who have used the trial multiple times (e.g., more than once)
+        df_multiple_trials = data['df_multiple_trials']
         st.subheader("Customers Who Used Trial Multiple Times") # Display the title in the Streamlit app
         if not df_multiple_trials.empty: # Check if there are any customers with multiple trials
             st.bar_chart(df_multiple_trials.set_index('email')['trial_count'])
@@ -709,42 +611,66 @@ class Dashboard:
             st.write("No customers have used the trial multiple times.")
         
         # Graph 5
-        # Convert start_date to datetime
-        subscriptions_df['start'] = pd.to_datetime(subscriptions_df['start'])
-        # Extract month and year
-        subscriptions_df['month_year'] = subscriptions_df['start'].dt.to_period('M')
-        # Group by month_year and status
-        trend_data = subscriptions_df.groupby(['month_year', 'status']).size().reset_index(name='count')
-        # Convert month_year to string for plotting
-        trend_data['month_year'] = trend_data['month_year'].astype(str)
+        # Subscriptions by start month and status
+        trend_data = data['status_trend']
         # Plot the trend line
-        fig = px.line(trend_data, x='month_year', y='count', color='status', title='Subscription Staus Trend Line Over Time')
-        fig.update_layout(
-            xaxis_title='Month-Year',
-            yaxis_title='Count',
-            template='plotly_white'
-        )
-        fig.update_traces(mode='lines+markers')
+        fig = self.figure('subscriptions_status_trend', trend_data, lambda: charts.line(
+            trend_data, x='month_year', y='count', color='status', title='Subscription Staus Trend Line Over Time',
+            update_traces={'mode': 'lines+markers'},
+            update_layout={
+                'xaxis': {'title': {'text': 'Month-Year'}},
+                'yaxis': {'title': {'text': 'Count'}},
+                'template': 'plotly_white'
+            }
+        ))
         # Display the plot
         st.plotly_chart(fig)
 
-        # Extract month and year
-        revenue_df['month_year'] = revenue_df['created'].dt.to_period('M')
-        # Group by month_year and subscription status
-        trend_data = revenue_df.groupby(['month_year', 'subscription']).size().reset_index(name='count')
-        # Convert month_year to string for plotting
-        trend_data['month_year'] = trend_data['month_year'].dt.strftime('%b %Y')
+        # Line items by month and subscription
+        trend_data = data['subscription_trend']
         # Plot the trend line
-        fig = px.line(trend_data, x='month_year', y='count', color='subscription', title='Subscription Count over time')
-        fig.update_layout(
-            xaxis_title='Month-Year',
-            yaxis_title='Count',
-            template='plotly_white'
-        )
-        fig.update_traces(mode='lines+markers')
+        fig = self.figure('subscriptions_count_trend', trend_data, lambda: charts.line(
+            trend_data, x='month_year', y='count', color='subscription', title='Subscription Count over time',
+            update_traces={'mode': 'lines+markers'},
+            update_layout={
+                'xaxis': {'title': {'text': 'Month-Year'}},
+                'yaxis': {'title': {'text': 'Count'}},
+                'template': 'plotly_white'
+            }
+        ))
         # Display the plot
         st.plotly_chart(fig)
 
+    def _payment_data(self, payment_df, start_date, end_date):
+        # Everything the Payment page shows for one date range
+        data = {}
+        # Filter data; only the bounds are cached, the rows are sliced again on every run
+        lo, hi = data['bounds'] = time_bounds(payment_df, 'created_date', start_date, end_date)
+        filtered_df = payment_df.iloc[lo:hi]
+
+        data['total_transactions'] = filtered_df.shape[0] # Calculate the total number of transactions
+        data['successful_transactions'] = filtered_df[filtered_df["status"] == "succeeded"].shape[0] # Calculate the number of successful transactions
+        data['failed_transactions'] = filtered_df[filtered_df["status"] == "failed"].shape[0] # Calculate the number of failed transactions
+
+        # Graph 1
+        refunded_line_items = filtered_df[filtered_df["refunded"] == True]["description"].value_counts() # Filter the dataframe to only include rows where the "refunded" column is True
+        top_2 = refunded_line_items.head(2)
+        other = refunded_line_items[2:].sum() if len(refunded_line_items) > 2 else 0
+        data['top_2_with_other'] = pd.concat([top_2, pd.Series({'Other': other})])
+
+        # Graph 2
+        data['status_counts'] = filtered_df['status'].value_counts()
+
+        # Graph 3
+        failure_reasons = (filtered_df["failure_code"].value_counts(normalize=True).head() * 100).round(2) # Calculate the percentage of each failure reason in the filtered dataframe
+        failure_reasons_df = failure_reasons.reset_index() # Reset the index of the failure_reasons dataframe
+        failure_reasons_df.columns = ['Failure Reason', 'Percentage'] # Rename the columns of the failure_reasons dataframe
+        data['failure_reasons_df'] = failure_reasons_df
+
+        # Graph 4
+        data['refunded_amounts'] = filtered_df[filtered_df["amount_refunded"] > 0]["amount_refunded"].value_counts().head() # Get the value counts of the refunded amounts in the filtered dataframe
+        return data
+
     def Payment(self,payment_df):
         # Hide the Streamlit toolbar
         st.markdown(
@@ -759,26 +685,31 @@ class Dashboard:
             )
         
         st.sidebar.header("Select Date Range:")
-        payment_df['created_date'] = pd.to_datetime(payment_df['created_date'], errors='coerce')
-
         start_date = st.sidebar.date_input("Start date", payment_df["created_date"].min().date())
         end_date = st.sidebar.date_input("End date", payment_df["created_date"].max().date())
 
-        # Filter data
-        filtered_df  = payment_df[(payment_df['created_date'] >= pd.to_datetime(start_date)) & (payment_df['created_date'] <= pd.to_datetime(end_date))]
+        self.trace.mark('Payment: data')
+        data = self.memoized('Payment', (start_date, end_date), lambda: self._payment_data(payment_df, start_date, end_date))
+        lo, hi = data['bounds']
+        filtered_df = payment_df.iloc[lo:hi]
         
         # Display data
+        def created_day(view_df):
+            # Dates without the time part, on the displayed page only
+            if 'created_date' in view_df.columns:
+                view_df = view_df.assign(created_date=view_df['created_date'].dt.date)
+            return view_df
         with st.expander("VIEW DATA"):
-            filtered_df['created_date'] = pd.to_datetime(filtered_df['created_date']).dt.date
-            showData = st.multiselect('Filter: ', filtered_df.columns, default=[
+            self.view_data(filtered_df, [
                 'id', 'amount', 'amount_refunded', 'balance_transaction_id',
                 'calculated_statement_descriptor',  'created_date', 'currency', 'customer_id',
-                'description', 'status'])
-            st.dataframe(filtered_df[showData], use_container_width=True)
+                'description', 'status'], 'Payment', index=self.derived('payments', 'sort_index', SortIndex, payment_df),
+                offset=lo, display=created_day, use_container_width=True)
 
-        total_transactions = filtered_df.shape[0] # Calculate the total number of transactions
-        successful_transactions = filtered_df[filtered_df["status"] == "succeeded"].shape[0] # Calculate the number of successful transactions
-        failed_transactions = filtered_df[filtered_df["status"] == "failed"].shape[0] # Calculate the number of failed transactions
+        self.trace.mark('Payment: KPI cards')
+        total_transactions = data['total_transactions']
+        successful_transactions = data['successful_transactions']
+        failed_transactions = data['failed_transactions']
 
         total1, total2, total3 = st.columns(3, gap='small')
         with total1:
@@ -795,38 +726,34 @@ class Dashboard:
 
         st.markdown("---")
         
+        self.trace.mark('Payment: charts')
         # Graph 1
         # Pie chart
         total1, total2 = st.columns(2, gap='small')
         with total1:
-            refunded_line_items = filtered_df[filtered_df["refunded"] == True]["description"].value_counts() # Filter the dataframe to only include rows where the "refunded" column is True
-            top_2 = refunded_line_items.head(2)
-            other = refunded_line_items[2:].sum() if len(refunded_line_items) > 2 else 0
-            top_2_with_other = pd.concat([top_2, pd.Series({'Other': other})])
+            top_2_with_other = data['top_2_with_other'] # Top 2 refunded line items and the rest as 'Other'
 
-            fig_1 = px.pie(values=top_2_with_other, names=top_2_with_other.index, title="Top 2 Refunded Line Items and Others",
-                        labels={'index': 'Refunded Items', 'values': 'Count'}, hole=0.3)
+            fig_1 = self.figure('payment_top_refunded', top_2_with_other, lambda: charts.pie(None, values=top_2_with_other, names=top_2_with_other.index, title="Top 2 Refunded Line Items and Others",
+                        labels={'value': 'Count'}, hole=0.3))
             st.plotly_chart(fig_1)
         
         # Graph 2
         with total2:
-            status_counts = filtered_df['status'].value_counts() # Count the number of times each status appears in the filtered dataframe
+            status_counts = data['status_counts'] # Count the number of times each status appears in the filtered dataframe
             if not status_counts.empty and 'succeeded' in status_counts and 'failed' in status_counts: # Check if the dataframe is not empty and if 'succeeded' and 'failed' statuses exist
                 succeeded_count = status_counts['succeeded'] # Get the count of 'succeeded' and 'failed' statuses
                 failed_count = status_counts['failed']
                 labels = ['Succeeded', 'Failed']  # Prepare the data for the pie chart
                 values = [succeeded_count, failed_count]
-                fig_2 = px.pie(values=values, names=labels, title="Payment Status Distribution",
-                            labels={'index': 'Payment Status', 'values': 'Count'}, hole=0.3)  # Create a Plotly pie chart for payment statuses
+                fig_2 = self.figure('payment_status', (values, labels), lambda: charts.pie(None, values=values, names=labels, title="Payment Status Distribution",
+                            labels={'value': 'Count'}, hole=0.3))  # Create a pie chart for payment statuses
                 st.plotly_chart(fig_2)
             else:
                 st.write("No data available for succeeded or failed payments.") # If the dataframe is empty or 'succeeded' and 'failed' statuses do not exist, display a message
 
         # Graph 3
-        failure_reasons = (filtered_df["failure_code"].value_counts(normalize=True).head() * 100).round(2) # Calculate the percentage of each failure reason in the filtered dataframe
-        failure_reasons_df = failure_reasons.reset_index() # Reset the index of the failure_reasons dataframe
-        failure_reasons_df.columns = ['Failure Reason', 'Percentage'] # Rename the columns of the failure_reasons dataframe
-        fig_3 = px.bar(
+        failure_reasons_df = data['failure_reasons_df'] # Top 5 failure reasons as percentages
+        fig_3 = self.figure('payment_failure_reasons', failure_reasons_df, lambda: charts.bar(
             failure_reasons_df, 
             x='Failure Reason', 
             y='Percentage',
@@ -834,22 +761,30 @@ class Dashboard:
             labels={'Failure Reason': 'Failure Reason', 'Percentage': 'Percentage (%)'},
             text='Percentage',
             width=800,  # Adjusted width
-            height=600
-        ) # Create a bar chart using Plotly Express
-        fig_3.update_traces(texttemplate='%{text:.2f}%', textposition='outside') # Update the text of the bar chart to display the percentage
-        fig_3.update_layout(
-            xaxis_title='Failure Reason', 
-            yaxis_title='Percentage (%)', 
-            xaxis_tickangle=320,
-            margin=dict(l=20, r=20, t=40, b=20),  # Adjust margins if needed
-        ) # Update the layout of the bar chart
+            height=600,
+            update_traces={'texttemplate': '%{text:.2f}%', 'textposition': 'outside'}, # Display the percentage on the bars
+            update_layout={
+                'xaxis': {'title': {'text': 'Failure Reason'}, 'tickangle': -40},
+                'yaxis': {'title': {'text': 'Percentage (%)'}},
+                'margin': dict(l=20, r=20, t=40, b=20),  # Adjust margins if needed
+            }
+        )) # Create a bar chart of the failure reasons
         st.plotly_chart(fig_3) # Plot the bar chart using Streamlit
 
         # Graph 4
-        refunded_amounts = filtered_df[filtered_df["amount_refunded"] > 0]["amount_refunded"].value_counts().head() # Get the value counts of the refunded amounts in the filtered dataframe
+        refunded_amounts = data['refunded_amounts'] # Most frequent refunded amounts
         st.subheader("Most Frequent Refunded Amounts") # Create a subheader for the most frequent refunded amounts
         st.bar_chart(refunded_amounts,x_label="Amount Refunded", y_label="Count") # Create a bar chart of the most frequent refunded amounts
 
+    def _financial_data(self, financial_df, start_date, end_date):
+        # Everything the financial page shows for one date range
+        data = {}
+        # Filter data; only the bounds are cached, the rows are sliced again on every run
+        data['bounds'] = time_bounds(financial_df, 'month', start_date, end_date)
+        # Running totals over the whole dataset, so each card is two lookups and a subtraction
+        data['totals'] = self.derived('financial', 'totals', build_financial_totals, financial_df).totals(start_date, end_date)
+        return data
+
     def financial(self,financial_df):
         st.markdown(
                 """
@@ -864,25 +799,26 @@ class Dashboard:
 
         # Sidebar options
         st.sidebar.header("Select Date Range:")
-        financial_df['month'] = pd.to_datetime(financial_df['month'], errors='coerce')
-
         start_date = st.sidebar.date_input("Start date", financial_df["month"].min().date())
         end_date = st.sidebar.date_input("End date", financial_df["month"].max().date())
 
-        # Filter data
-        filtered_df = financial_df[(financial_df['month'] >= pd.to_datetime(start_date)) & (financial_df['month'] <= pd.to_datetime(end_date))]
+        self.trace.mark('Financial: data')
+        data = self.memoized('Financial', (start_date, end_date), lambda: self._financial_data(financial_df, start_date, end_date))
+        lo, hi = data['bounds']
+        filtered_df = financial_df.iloc[lo:hi]
 
         # Create an expander to view the data
         with st.expander("VIEW DATA"):
-            showData = st.multiselect('Filter: ',  filtered_df.columns, default=[
-                'month','currency','total_sales','total_refunds','total_payouts','net_profit_loss'])
-            st.dataframe( filtered_df[showData], use_container_width=True)
+            self.view_data(filtered_df, ['month','currency','total_sales','total_refunds','total_payouts','net_profit_loss'],
+                           'Financial', use_container_width=True)
 
 
-        total_sales = filtered_df['total_sales'].sum() # Calculate the total sales from the filtered dataframe
-        total_refunds = filtered_df['total_refunds'].sum() # Calculate the total refunds from the filtered dataframe
-        total_payouts = filtered_df['total_payouts'].sum() # Calculate the total payouts from the filtered dataframe
-        net_profit_loss = filtered_df['net_profit_loss'].sum() # Calculate the net profit or loss from the filtered dataframe
+        self.trace.mark('Financial: KPI cards')
+        totals = data['totals']
+        total_sales = totals['total_sales'] # Calculate the total sales from the filtered dataframe
+        total_refunds = totals['total_refunds'] # Calculate the total refunds from the filtered dataframe
+        total_payouts = totals['total_payouts'] # Calculate the total payouts from the filtered dataframe
+        net_profit_loss = totals['net_profit_loss'] # Calculate the net profit or loss from the filtered dataframe
 
 
         total1, total2 = st.columns(2, gap='small')
@@ -908,60 +844,83 @@ class Dashboard:
 
         
 
+        self.trace.mark('Financial: charts')
         # Plotting the data
         st.title("Financial Overview")
         total1, total2 = st.columns(2, gap='small')
 
         with total1:
-            fig_sales = px.bar(filtered_df, x='month', y='total_sales', title='Total Sales Over Time')
+            fig_sales = self.figure('financial_total_sales', filtered_df, lambda: charts.bar(filtered_df, x='month', y='total_sales', title='Total Sales Over Time'))
             st.plotly_chart(fig_sales)
 
 
         with total2:
-            fig_refunds = px.bar(filtered_df, x='month', y='total_refunds', title='Total Refunds Over Time')
+            fig_refunds = self.figure('financial_total_refunds', filtered_df, lambda: charts.bar(filtered_df, x='month', y='total_refunds', title='Total Refunds Over Time'))
             st.plotly_chart(fig_refunds)
 
         total3, total4 = st.columns(2, gap='medium')
 
         with total3:
-            fig_payouts = px.bar(filtered_df, x='month', y='total_payouts', title='Total Payouts Over Time')
+            fig_payouts = self.figure('financial_total_payouts', filtered_df, lambda: charts.bar(filtered_df, x='month', y='total_payouts', title='Total Payouts Over Time'))
             st.plotly_chart(fig_payouts)
 
         with total4:
-            fig_net_profit_loss = px.bar(filtered_df, x='month', y='net_profit_loss', title='Net Profit/Loss Over Time')
+            fig_net_profit_loss = self.figure('financial_net_profit_loss', filtered_df, lambda: charts.bar(filtered_df, x='month', y='net_profit_loss', title='Net Profit/Loss Over Time'))
             st.plotly_chart(fig_net_profit_loss)
 
 
-def main():
+@st.cache_resource
+def get_dataset_store():
+    # One store per server process, shared by every session and rerun
+    mirror = DiskMirror()
+    mirror.prune(DATASET_KEYS.values())
+    return DatasetStore(mirror=mirror)
 
-    if authenticate_user():
-        s3_client = boto3.client('s3')
-        bucket_name = 'braintaprawdata'
-        # Fetch the object from S3
-        response = s3_client.get_object(Bucket=bucket_name, Key='dashboard_processed_files/KPI_Revenue_total_counts.csv')
-        content = response['Body'].read().decode('utf-8')# Read the content
-        Revenue_df = pd.read_csv(StringIO(content))
-
-        response2 = s3_client.get_object(Bucket=bucket_name, Key='dashboard_processed_files/customers_6months.csv')
-        content2 = response2['Body'].read().decode('utf-8')
-        customers_df= pd.read_csv(StringIO(content2))
-
-        response1 = s3_client.get_object(Bucket=bucket_name, Key='dashboard_processed_files/subscriptions_6months.csv')
-        content1 = response1['Body'].read().decode('utf-8')
-        subscriptions_df = pd.read_csv(StringIO(content1))
-
-        response = s3_client.get_object(Bucket=bucket_name, Key='payments_outcome_data.csv')
-        content = response['Body'].read().decode('utf-8')
-        payment_df = pd.read_csv(StringIO(content))
-
-        response = s3_client.get_object(Bucket=bucket_name, Key='financial.csv')
-        content = response['Body'].read().decode('utf-8')
-        financial_df = pd.read_csv(StringIO(content))
-        
-        
 
-        dashboard = Dashboard(Revenue_df, customers_df, subscriptions_df, payment_df, financial_df)
+@st.cache_resource
+def get_page_cache():
+    # Metric values shared by every session and page; keyed by dataset versions, so never stale.
+    # Bounded by DASHBOARD_PAGE_CACHE_MB, with results not used lately kept compressed. A page
+    # reads a couple of dozen metrics, so as many are kept uncompressed as a few pages need
+    return PageCache(max_entries=512, hot_entries=64, compress=True)
+
 
+@st.cache_resource
+def get_figure_cache():
+    # Built charts shared by every session; keyed by a hash of each chart's data
+    return FigureCache(max_entries=256)
+
+
+# Datasets each page reads; only these are loaded before the page renders
+PAGE_DATASETS = {
+    "Summary": ['revenue', 'subscriptions'],
+    "Subscriptions": ['subscriptions', 'customers', 'revenue'],
+    "Customers": ['customers', 'subscriptions'],
+    "Payment": ['payments'],
+    "Revenue": ['revenue'],
+    "Financial": ['financial'],
+}
+
+
+def main():
+    # Every full run is traced; a fragment rerun records itself (see Dashboard.view_data)
+    if 'rerun_trace' not in st.session_state:
+        st.session_state['rerun_trace'] = RerunTrace()
+    trace = st.session_state['rerun_trace']
+    trace.start('full')
+    try:
+        render(trace)
+    finally:
+        trace.end()
+    if SHOW_RERUN_TRACE:
+        with st.sidebar.expander("Rerun trace"):
+            st.dataframe(pd.DataFrame(trace.rows()), hide_index=True)
+            st.dataframe(pd.DataFrame(trace.milestone_rows()), hide_index=True)
+
+
+def render(trace):
+    trace.mark('login')
+    if authenticate_user():
         with st.sidebar:
             selected = option_menu(
                 menu_title="Select a Page",
@@ -971,6 +930,22 @@ def main():
                 default_index=0
             )
 
+        # Load what this page needs from the shared store and warm the rest in the background
+        trace.mark('load')
+        store = get_dataset_store()
+        frames, versions = store.snapshot(PAGE_DATASETS[selected])
+        store.prefetch(name for name in DATASET_KEYS if name not in frames)
+        Revenue_df = frames.get('revenue')
+        customers_df = frames.get('customers')
+        subscriptions_df = frames.get('subscriptions')
+        payment_df = frames.get('payments')
+        financial_df = frames.get('financial')
+
+        dashboard = Dashboard(Revenue_df, customers_df, subscriptions_df, payment_df, financial_df, store=store,
+                              versions=versions, page_cache=get_page_cache(),
+                              figure_cache=get_figure_cache(), trace=trace)
+
+        trace.mark(f'{selected}: filters')
         if selected == "Summary":
             st.title(f"{selected}")
             dashboard.Summary(Revenue_df, customers_df, subscriptions_df, payment_df, financial_df)
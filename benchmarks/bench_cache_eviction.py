@@ -0,0 +1,59 @@
+# PageCache under a memory budget: hit rate and bytes held for a skewed mix
+# of date ranges whose results are DataFrames, with plain LRU eviction, the
+# LRU/LFU window, and the window plus zstd-compressed cold entries.
+#
+#   python -m benchmarks.bench_cache_eviction --budget-mb 64 --requests 3000
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from page_cache import PageCache, deep_size
+
+
+def result(date_range, rows):
+    # Shaped like a page's data: a filtered frame with repetitive strings plus a few totals
+    rng = np.random.default_rng(date_range)
+    frame = pd.DataFrame({
+        'created': pd.Timestamp('2024-01-01') + pd.to_timedelta(np.sort(rng.integers(0, 180 * 86400, rows)), unit='s'),
+        'customer_name': rng.choice([f'Customer {i}' for i in range(500)], rows),
+        'status': rng.choice(['paid', 'open', 'void'], rows),
+        'amount': rng.integers(0, 50_000, rows) / 100,
+    })
+    return {'filtered_df': frame, 'total': float(frame['amount'].sum())}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--budget-mb', type=float, default=64)
+    parser.add_argument('--requests', type=int, default=3000)
+    parser.add_argument('--ranges', type=int, default=300)
+    parser.add_argument('--rows', type=int, default=20_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    ranges = np.minimum(rng.zipf(1.3, args.requests), args.ranges)
+    results = {date_range: result(date_range, args.rows) for date_range in np.unique(ranges)}
+    entry_mb = deep_size(next(iter(results.values()))) / 2 ** 20
+    print(f"{len(results)} distinct ranges, {entry_mb:.1f} MB per result, budget {args.budget_mb:g} MB")
+
+    policies = {
+        'LRU': dict(lfu_window=1),
+        'LRU/LFU window 8': dict(lfu_window=8),
+        'window 8 + zstd': dict(lfu_window=8, compress=True),
+    }
+    print(f"{'policy':>18}{'hit rate':>10}{'entries':>9}{'MB held':>9}{'compressed':>12}{'evictions':>11}{'s':>7}")
+    for policy, options in policies.items():
+        cache = PageCache(max_entries=10_000, max_bytes=int(args.budget_mb * 2 ** 20), **options)
+        started = time.perf_counter()
+        for date_range in ranges:
+            cache.get(('Revenue', (('revenue', 1),), int(date_range)), lambda: results[date_range])
+        elapsed = time.perf_counter() - started
+        stats = cache.stats()
+        print(f"{policy:>18}{stats['hit_rate']:>10.3f}{stats['entries']:>9}{stats['bytes'] / 2 ** 20:>9.1f}"
+              f"{stats['compressed_entries']:>12}{stats['cache'].get('evictions', 0):>11}{elapsed:>7.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+# The Revenue page's chart aggregations as a task graph, run one after
+# another (0 workers) and on thread pools of several sizes: wall time and
+# speedup for a date range covering most of the table. The graph is the
+# page's, from metrics.py: the filtered frame, the monthly figures and the
+# product rows of the rollup are computed once and shared. The rollup itself
+# is built beforehand, as the dataset store does once per data version.
+#
+#   python -m benchmarks.bench_chart_graph --rows 5000000 --workers 0 2 4 8
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import make_revenue
+from metric_graph import MetricExecutor
+from metrics import METRICS
+from normalize import normalize
+from rollups import build_revenue_rollup
+from schemas import apply_schema
+
+CHUNK_ROWS = 500_000
+# Only the columns the charts read, so large tables fit in memory
+COLUMNS = ['created', 'email', 'subscription', 'subscription_plan', 'description', 'currency',
+           'total_invoice_amount', 'fee', 'tax', 'net_amount']
+CHARTS = ['monthly_net_amount', 'monthly_tax', 'top_customers', 'top_revenue_by_product', 'tax_fee', 'subscription_analysis',
+          'monthly_transaction', 'monthly_subscription', 'monthly_product', 'monthly_tax_trend']
+
+
+def revenue_graph(revenue_df, rollup, start_date, end_date):
+    # The page's chart metrics, without caches; the rollup is passed in as if the store had it
+    inputs = {'revenue': revenue_df, 'daily_rollup': rollup, 'start_date': start_date, 'end_date': end_date}
+    return MetricExecutor(METRICS, inputs).graph(CHARTS)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 2, 4, 8])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    revenue_df = pd.concat([normalize('revenue', apply_schema(make_revenue(min(CHUNK_ROWS, args.rows - start), seed=start)[COLUMNS], 'revenue'))
+                            for start in range(0, args.rows, CHUNK_ROWS)], ignore_index=True)
+    revenue_df = revenue_df.sort_values('created', kind='stable', ignore_index=True)
+    rollup = build_revenue_rollup(revenue_df)
+    start_date, end_date = revenue_df['created'].min() + pd.Timedelta(days=7), revenue_df['created'].max()
+    print(f"{len(revenue_df):,} rows, {os.cpu_count()} CPUs")
+
+    expected = None
+    print(f"{'workers':>8}{'seconds':>10}{'speedup':>9}")
+    for workers in args.workers:
+        best = float('inf')
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            values = dict(revenue_graph(revenue_df, rollup, start_date, end_date).run(workers))
+            best = min(best, time.perf_counter() - started)
+        if expected is None:
+            expected, sequential = values, best
+        assert all(values[name].equals(expected[name]) for name in expected)
+        print(f"{workers:>8}{best:>10.3f}{sequential / best:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
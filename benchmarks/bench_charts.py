@@ -0,0 +1,84 @@
+# Plotly Express against the charts module for the dashboard's chart
+# patterns: build time, and build plus the JSON st.plotly_chart sends. Each
+# pair is checked to serialize to the same figure.
+#
+#   python -m benchmarks.bench_charts --months 36 --repeat 20
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.io as pio
+
+import charts
+
+
+def timed(fn, repeat):
+    fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def patterns(months, rng):
+    labels = pd.period_range('2022-01', periods=months, freq='M').strftime('%B %Y')
+    monthly = pd.DataFrame({'month': labels, 'total_invoice_amount': rng.integers(10_000, 90_000, months) / 100,
+                            'tax': rng.integers(0, 9_000, months) / 100, 'fee': rng.integers(0, 3_000, months) / 100})
+    monthly['percent_change'] = monthly['total_invoice_amount'].pct_change() * 100
+    hovertext = monthly['percent_change'].apply(lambda x: f'{x:.2f}%' if pd.notnull(x) else '')
+    top = pd.DataFrame({'email': [f'customer{i}@example.com' for i in range(5)], 'total_invoice_amount': rng.integers(1, 9, 5) * 1000})
+    trend = pd.DataFrame({'month_year': np.repeat(labels, 4), 'status': np.tile(['active', 'canceled', 'trialing', 'past_due'], months),
+                          'count': rng.integers(0, 500, 4 * months)})
+    counts = [np.int64(n) for n in rng.integers(1, 900, 2)]
+    white = {'xaxis': {'title': {'text': 'Month'}, 'categoryorder': 'trace'}, 'template': 'plotly_white'}
+
+    def px_trend():
+        fig = px.bar(monthly, x='month', y='total_invoice_amount', title='Total Transaction Amount by Month')
+        fig.add_scatter(x=monthly['month'], y=monthly['total_invoice_amount'], mode='lines+markers', name='Trend',
+                        hovertext=hovertext, hoverinfo='text')
+        fig.update_layout(xaxis_title='Month', xaxis={'categoryorder': 'trace'}, template='plotly_white')
+        return fig
+
+    def px_line():
+        fig = px.line(trend, x='month_year', y='count', color='status', title='Subscription Status Trend')
+        fig.update_traces(mode='lines+markers')
+        return fig
+
+    return {
+        'bar': (lambda: px.bar(monthly, x='month', y='total_invoice_amount', title='Total'),
+                lambda: charts.bar(monthly, x='month', y='total_invoice_amount', title='Total')),
+        'bar, two columns': (lambda: px.bar(monthly, x='month', y=['tax', 'fee'], title='Tax and Fee'),
+                             lambda: charts.bar(monthly, x='month', y=['tax', 'fee'], title='Tax and Fee')),
+        'trend bar': (px_trend,
+                      lambda: charts.trend_bar(monthly, x='month', y='total_invoice_amount', title='Total Transaction Amount by Month',
+                                               hovertext=hovertext, update_layout=white)),
+        'pie': (lambda: px.pie(top, names='email', values='total_invoice_amount', title='Top 5', hole=0.3),
+                lambda: charts.pie(top, names='email', values='total_invoice_amount', title='Top 5', hole=0.3)),
+        'pie of lists': (lambda: px.pie(values=counts, names=['Succeeded', 'Failed'], title='Status', hole=0.3),
+                         lambda: charts.pie(None, values=counts, names=['Succeeded', 'Failed'], title='Status', hole=0.3)),
+        'line by colour': (px_line,
+                           lambda: charts.line(trend, x='month_year', y='count', color='status', title='Subscription Status Trend',
+                                               update_traces={'mode': 'lines+markers'})),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--months', type=int, default=36)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'chart':>16}{'px ms':>9}{'charts ms':>11}{'px + json ms':>14}{'charts + json ms':>18}")
+    for name, (express, builder) in patterns(args.months, np.random.default_rng(0)).items():
+        assert json.loads(pio.to_json(express())) == json.loads(pio.to_json(builder())), name
+        express_s, builder_s = timed(express, args.repeat), timed(builder, args.repeat)
+        express_json_s = timed(lambda: pio.to_json(express(), validate=False), args.repeat)
+        builder_json_s = timed(lambda: pio.to_json(builder(), validate=False), args.repeat)
+        print(f"{name:>16}{1000 * express_s:>9.1f}{1000 * builder_s:>11.2f}{1000 * express_json_s:>14.1f}{1000 * builder_json_s:>18.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+# Compare sequential vs concurrent loading of the five dashboard datasets
+# against an in-process S3 stand-in (moto), with optional per-request latency.
+#
+#   python -m benchmarks.bench_concurrent_load --scale 0.5 --latency 0.2
+import argparse
+import time
+
+import boto3
+from moto import mock_aws
+
+from benchmarks.synthetic import make_datasets
+from data_loader import BUCKET_NAME, DATASET_KEYS, fetch_csv, load_datasets
+
+
+def add_latency(s3_client, seconds):
+    # Simulate the network round trip to S3 on every GetObject call
+    def sleep(**kwargs):
+        time.sleep(seconds)
+    s3_client.meta.events.register('before-send.s3.GetObject', sleep)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scale', type=float, default=0.5)
+    parser.add_argument('--latency', type=float, default=0.2)
+    args = parser.parse_args()
+
+    with mock_aws():
+        s3_client = boto3.client('s3', region_name='us-east-1')
+        s3_client.create_bucket(Bucket=BUCKET_NAME)
+        for name, df in make_datasets(args.scale).items():
+            s3_client.put_object(Bucket=BUCKET_NAME, Key=DATASET_KEYS[name], Body=df.to_csv(index=False).encode())
+        add_latency(s3_client, args.latency)
+
+        started = time.perf_counter()
+        # Same schema parse as the concurrent path
+        sequential = {name: fetch_csv(s3_client, key, name=name)[1] for name, key in DATASET_KEYS.items()}
+        sequential_wall = time.perf_counter() - started
+
+        _, timings = load_datasets(s3_client=s3_client)
+
+    print(f"{'dataset':<14}{'MB':>8}{'rows':>10}{'fetch s':>10}{'parse s':>10}{'total s':>10}")
+    for name in DATASET_KEYS:
+        t = timings[name]
+        print(f"{name:<14}{t['bytes'] / 1e6:>8.1f}{t['rows']:>10}{t['fetch_s']:>10.3f}{t['parse_s']:>10.3f}{t['total_s']:>10.3f}")
+    slowest = max(sequential[name]['total_s'] for name in DATASET_KEYS)
+    print()
+    print(f"sequential wall:      {sequential_wall:.3f}s")
+    print(f"concurrent wall:      {timings['_wall']['total_s']:.3f}s")
+    print(f"slowest single object: {slowest:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
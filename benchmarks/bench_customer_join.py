@@ -0,0 +1,77 @@
+# Subscriptions joined to their customers, as the Customers and Subscriptions
+# pages read them: merging the subscriptions of a trial-date range on every
+# rerun, against building the customer id index and the whole join once per
+# pair of data versions and taking a slice of it per range. Checks the slices
+# equal the merges.
+#
+#   python -m benchmarks.bench_customer_join --customers 1000000 --subscriptions 3000000
+import argparse
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import make_customers, make_subscriptions
+from joins import build_customer_subscriptions, build_id_index
+from normalize import normalize
+from schemas import apply_schema
+from time_index import time_bounds, time_slice
+
+CHUNK_ROWS = 500_000
+# Fractions of the trial dates covered by the ranges timed
+SPANS = [0.01, 0.1, 0.5, 1.0]
+
+
+def load(name, make, rows, **kwargs):
+    # Generated and normalized in chunks, so large tables fit in memory
+    chunks = [normalize(name, apply_schema(make(min(CHUNK_ROWS, rows - start), seed=start, **kwargs), name))
+              for start in range(0, rows, CHUNK_ROWS)]
+    df = pd.concat(chunks, ignore_index=True)
+    if name == 'customers':
+        # Ids are numbered per chunk: keep them unique across chunks
+        df['id'] = 'cus_' + pd.Series(range(len(df))).astype(str)
+        return df
+    return df.sort_values('trial_end', kind='stable', ignore_index=True)
+
+
+def best_of(repeat, fn):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        value = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, value
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--customers', type=int, default=1_000_000)
+    parser.add_argument('--subscriptions', type=int, default=3_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    customers_df = load('customers', make_customers, args.customers)
+    subscriptions_df = load('subscriptions', make_subscriptions, args.subscriptions, n_customers=args.customers)
+    print(f"{len(customers_df):,} customers, {len(subscriptions_df):,} subscriptions")
+
+    started = time.perf_counter()
+    id_index = build_id_index(customers_df)
+    table = build_customer_subscriptions(subscriptions_df, customers_df, id_index)
+    print(f"index and join built once in {time.perf_counter() - started:.3f}s ({len(table):,} rows)")
+
+    first, last = subscriptions_df['trial_end'].min(), subscriptions_df['trial_end'].max()
+    print(f"{'span':>6}{'rows':>11}{'merge s':>10}{'slice s':>10}{'speedup':>10}")
+    for span in SPANS:
+        start_date = last - (last - first) * span
+        merge_time, merged = best_of(args.repeat, lambda: time_slice(subscriptions_df, 'trial_end', start_date, last).merge(
+            customers_df, left_on="customer_id", right_on="id", how="inner"))
+
+        def take_slice():
+            lo, hi = time_bounds(table, 'trial_end', start_date, last)
+            return table.iloc[lo:hi]
+        slice_time, sliced = best_of(args.repeat, take_slice)
+        pd.testing.assert_frame_equal(sliced.reset_index(drop=True), merged)
+        print(f"{span:>6.0%}{len(sliced):>11,}{merge_time:>10.3f}{slice_time:>10.5f}{merge_time / slice_time:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+# Compare parsing the revenue CSV with loading its Parquet mirror at several sizes.
+#
+#   python -m benchmarks.bench_disk_mirror --base-rows 20000 --scales 1,10,100
+import argparse
+import tempfile
+import time
+from io import StringIO
+
+from benchmarks.synthetic import make_revenue
+from disk_mirror import DiskMirror
+from schemas import read_dataset
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--base-rows', type=int, default=20_000, help='revenue rows at 1x')
+    parser.add_argument('--scales', default='1,10,100')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    mirror = DiskMirror(tempfile.mkdtemp())
+    key = 'dashboard_processed_files/KPI_Revenue_total_counts.csv'
+    print(f"{'scale':>6}{'rows':>12}{'csv MB':>9}{'csv s':>9}{'mirror s':>10}{'speedup':>9}")
+    for scale in (int(s) for s in args.scales.split(',')):
+        n = args.base_rows * scale
+        content = make_revenue(n).to_csv(index=False)
+        parse_csv = lambda: read_dataset(StringIO(content), 'revenue')
+        mirror.save(key, '"%d"' % scale, parse_csv())
+        load_mirror = lambda: mirror.load(key, '"%d"' % scale)
+        csv_s = best_of(parse_csv, args.repeat)
+        mirror_s = best_of(load_mirror, args.repeat)
+        print(f"{scale:>5}x{n:>12}{len(content) / 1e6:>9.1f}{csv_s:>9.3f}{mirror_s:>10.3f}{csv_s / mirror_s:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
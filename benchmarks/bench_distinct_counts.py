@@ -0,0 +1,62 @@
+# Distinct customers over day windows: slicing and nunique (what Summary used
+# to do) against DistinctByDay in exact and HyperLogLog modes.
+#
+#   python -m benchmarks.bench_distinct_counts --rows 5000000
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from distinct_counts import DistinctByDay
+from time_index import time_slice
+
+
+def best_of(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--customers', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    created = pd.Timestamp('2024-01-01') + pd.to_timedelta(np.sort(rng.integers(0, 365 * 86400, args.rows)), unit='s')
+    df = pd.DataFrame({
+        'created': created,
+        'date': created.normalize(),
+        'customer_id': pd.Series(rng.integers(0, args.customers, args.rows)).map('cus_{}'.format),
+    })
+
+    sketches = {'exact': None, 'hll p=12': 12, 'hll p=14': 14}
+    built = {}
+    for label, precision in sketches.items():
+        started = time.perf_counter()
+        built[label] = DistinctByDay(df, 'date', 'customer_id', precision)
+        print(f"build {label:<9}{time.perf_counter() - started:>7.2f}s")
+
+    today = df['date'].max()
+    print(f"{'window days':>12}{'distinct':>10}{'nunique ms':>12}" + ''.join(f"{label + ' ms':>14}{'err %':>7}" for label in sketches))
+    for days in (1, 7, 30, 365):
+        start = today - pd.Timedelta(days=days - 1)
+        end = today + pd.Timedelta(days=1)
+        nunique = lambda: time_slice(df, 'created', start, end, inclusive='left')['customer_id'].nunique()
+        expected = nunique()
+        line = f"{days:>12}{expected:>10}{best_of(nunique) * 1e3:>12.1f}"
+        for label, counter in built.items():
+            actual = counter.count(start, end)
+            if label == 'exact':
+                assert actual == expected, (actual, expected)
+            line += f"{best_of(lambda: counter.count(start, end)) * 1e3:>14.2f}{(actual - expected) / expected * 100:>7.2f}"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+# Building the dashboard's kinds of Plotly Express figures on every rerun
+# against looking them up in FigureCache by a fingerprint of their data.
+#
+#   python -m benchmarks.bench_figure_cache --reruns 20
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from figure_cache import FigureCache
+
+
+def chart_inputs(rng):
+    months = pd.period_range('2022-01', periods=36, freq='M').strftime('%B %Y')
+    monthly = pd.DataFrame({'month': months, 'total_invoice_amount': rng.integers(10_000, 90_000, 36) / 100})
+    monthly['percent_change'] = monthly['total_invoice_amount'].pct_change() * 100
+    days = pd.DataFrame({'day': pd.date_range('2022-01-01', periods=1000), 'customer_id': rng.integers(0, 50, 1000)})
+    top = pd.DataFrame({'email': [f'customer{i}@example.com' for i in range(5)], 'total_invoice_amount': rng.integers(1, 9, 5) * 1000})
+    trend = pd.DataFrame({'month_year': np.repeat(months, 4), 'status': np.tile(['active', 'canceled', 'trialing', 'past_due'], 36),
+                          'count': rng.integers(0, 500, 144)})
+    return monthly, days, top, trend
+
+
+def charts(monthly, days, top, trend):
+    def trend_bar():
+        fig = px.bar(monthly, x='month', y='total_invoice_amount', title='Total Transaction Amount by Month')
+        fig.add_scatter(x=monthly['month'], y=monthly['total_invoice_amount'], mode='lines+markers', name='Trend',
+                        hovertext=monthly['percent_change'].apply(lambda x: f'{x:.2f}%' if pd.notnull(x) else ''), hoverinfo='text')
+        fig.update_layout(xaxis={'categoryorder': 'trace'}, template='plotly_white')
+        return fig
+
+    def status_line():
+        fig = px.line(trend, x='month_year', y='count', color='status', title='Subscription Status Trend')
+        fig.update_traces(mode='lines+markers')
+        return fig
+
+    # Roughly the mix of the dashboard's 25 charts
+    return ([(f'trend_{i}', monthly, trend_bar) for i in range(8)]
+            + [(f'bar_{i}', monthly, lambda: px.bar(monthly, x='month', y='total_invoice_amount')) for i in range(8)]
+            + [(f'pie_{i}', top, lambda: px.pie(top, names='email', values='total_invoice_amount')) for i in range(5)]
+            + [(f'line_{i}', trend, status_line) for i in range(2)]
+            + [(f'daily_{i}', days, lambda: px.bar(days, x='day', y='customer_id')) for i in range(2)])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--reruns', type=int, default=20)
+    args = parser.parse_args()
+
+    figures = charts(*chart_inputs(np.random.default_rng(0)))
+    started = time.perf_counter()
+    for _ in range(args.reruns):
+        for name, data, build in figures:
+            build()
+    uncached_s = (time.perf_counter() - started) / args.reruns
+
+    cache = FigureCache()
+    started = time.perf_counter()
+    for _ in range(args.reruns):
+        for name, data, build in figures:
+            cache.get(name, data, build)
+    cached_s = (time.perf_counter() - started) / args.reruns
+    stats = cache.stats()
+    print(f"{len(figures)} figures per rerun, {args.reruns} reruns")
+    print(f"built every rerun: {1000 * uncached_s:8.1f} ms per rerun")
+    print(f"FigureCache:       {1000 * cached_s:8.1f} ms per rerun (first rerun builds; "
+          f"{stats['mean_build_ms']} ms per build, {stats['mean_lookup_ms']} ms per lookup)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+# Per-rerun conversion work the pages used to redo on every interaction,
+# against the one-time cost of normalize.py per dataset version.
+#
+#   python -m benchmarks.bench_normalize --scale 1
+import argparse
+import time
+from io import StringIO
+
+import pandas as pd
+
+from benchmarks.synthetic import make_datasets
+from normalize import normalize
+from schemas import read_dataset
+
+
+def timed(fn):
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def summary_rerun(revenue, subscriptions):
+    revenue['created'] = pd.to_datetime(revenue['created'], errors='coerce')
+    revenue['created'].dt.date.max()
+    for _ in range(12):  # six KPI windows, each comparing .dt.date once or twice
+        revenue['created'].dt.date
+    revenue['month'] = revenue['created'].dt.to_period('M').astype(str)
+    subscriptions['created'] = pd.to_datetime(subscriptions['created'])
+    subscriptions['month'] = subscriptions['created'].dt.to_period('M').astype(str)
+    subscriptions['canceled_at'] = pd.to_datetime(subscriptions['canceled_at'])
+    subscriptions['month'] = subscriptions['canceled_at'].dt.to_period('M').astype(str)
+
+
+def revenue_rerun(revenue):
+    revenue['created'] = pd.to_datetime(revenue['created'], errors='coerce')
+    revenue['year_month'] = revenue['created'].dt.to_period('M')
+    revenue['month'] = revenue['created'].dt.strftime('%Y-%m')
+    revenue['year'] = revenue['created'].dt.year
+    revenue['month'] = revenue['created'].dt.strftime('%B')
+
+
+def subscriptions_rerun(subscriptions, revenue):
+    for column in ('trial_end', 'created', 'start'):
+        subscriptions[column] = pd.to_datetime(subscriptions[column])
+    revenue['created'] = pd.to_datetime(revenue['created'])
+    subscriptions['month'] = subscriptions['created'].dt.to_period('M').astype(str)
+    subscriptions['day'] = subscriptions['created'].dt.strftime('%Y-%m-%d')
+    subscriptions['month_year'] = subscriptions['start'].dt.to_period('M')
+    revenue['month_year'] = revenue['created'].dt.to_period('M')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scale', type=float, default=1.0)
+    args = parser.parse_args()
+
+    raw = make_datasets(args.scale)
+    csv = {name: df.to_csv(index=False) for name, df in raw.items()}
+    typed = {name: read_dataset(StringIO(content), name) for name, content in csv.items()}
+
+    print(f"{'page':<14}{'old per rerun s':>17}")
+    reruns = {
+        'Summary': lambda: summary_rerun(raw['revenue'].copy(), raw['subscriptions'].copy()),
+        'Revenue': lambda: revenue_rerun(raw['revenue'].copy()),
+        'Subscriptions': lambda: subscriptions_rerun(raw['subscriptions'].copy(), raw['revenue'].copy()),
+    }
+    for page, fn in reruns.items():
+        print(f"{page:<14}{timed(fn):>17.3f}")
+
+    print()
+    print(f"{'dataset':<14}{'normalize once s':>17}")
+    for name in ('revenue', 'customers', 'subscriptions'):
+        print(f"{name:<14}{timed(lambda: normalize(name, typed[name])):>17.3f}")
+
+
+if __name__ == '__main__':
+    main()
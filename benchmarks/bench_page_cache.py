@@ -0,0 +1,50 @@
+# Page computations shared through PageCache: concurrent sessions asking for
+# the same page and filters, and hit rates for a skewed mix of date ranges.
+#
+#   python -m benchmarks.bench_page_cache --sessions 8 --compute-ms 300
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from page_cache import PageCache
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sessions', type=int, default=8)
+    parser.add_argument('--compute-ms', type=float, default=300)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--ranges', type=int, default=400)
+    args = parser.parse_args()
+
+    computed = []
+
+    def compute():
+        computed.append(1)
+        time.sleep(args.compute_ms / 1000)
+        return {'total': 1.0}
+
+    # Every session opens the page on the default date range at the same moment
+    cache = PageCache()
+    key = ('Revenue', (('revenue', 1),), ('2024-01-01', '2024-06-30'))
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+        list(pool.map(lambda _: cache.get(key, compute), range(args.sessions)))
+    print(f"{args.sessions} concurrent sessions, same filters: {len(computed)} computation(s), "
+          f"{time.perf_counter() - started:.2f}s wall")
+
+    # Reruns over many date ranges, most of them on a few popular ones
+    rng = np.random.default_rng(0)
+    ranges = np.minimum(rng.zipf(1.3, args.requests), args.ranges)
+    for max_entries in (16, 64, 256):
+        cache = PageCache(max_entries=max_entries)
+        for date_range in ranges:
+            cache.get(('Revenue', (('revenue', 1),), int(date_range)), lambda: None)
+        stats = cache.stats()
+        print(f"max_entries={max_entries:<4} hit rate {stats['hit_rate']:.3f}, evictions {stats['cache'].get('evictions', 0)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# Date-range totals on a time-sorted table: slicing and summing the column
+# (what the cards used to do) against two lookups in a PrefixSums.
+#
+#   python -m benchmarks.bench_prefix_sums --rows 1000000 10000000
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from prefix_sums import PrefixSums
+from time_index import time_slice
+
+MEASURES = ['total_invoice_amount', 'tax', 'fee', 'net_amount']
+
+
+def best_of(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def make_frame(rows, rng):
+    offsets = np.sort(rng.integers(0, 365 * 86400, rows))
+    df = pd.DataFrame({'created': pd.Timestamp('2024-01-01') + pd.to_timedelta(offsets, unit='s')})
+    for column in MEASURES:
+        df[column] = (rng.random(rows) * 500).round(2)
+    df.loc[::1000, 'tax'] = np.nan
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'rows':>12}{'window days':>12}{'build s':>9}{'sum ms':>10}{'prefix ms':>11}{'max diff':>10}")
+    for rows in args.rows:
+        df = make_frame(rows, rng)
+        started = time.perf_counter()
+        sums = PrefixSums(df, 'created', MEASURES)
+        build_s = time.perf_counter() - started
+        for days in (1, 30, 365):
+            start = pd.Timestamp('2024-01-01') + pd.Timedelta(days=int(rng.integers(0, 366 - days)))
+            end = start + pd.Timedelta(days=days)
+            summed = lambda: time_slice(df, 'created', start, end)[MEASURES].sum()
+            looked_up = lambda: sums.totals(start, end)
+            expected, actual = summed(), looked_up()
+            diff = max(abs(expected[column] - actual[column]) for column in MEASURES)
+            assert diff < 0.005, diff
+            print(f"{rows:>12}{days:>12}{build_s:>9.2f}{best_of(summed) * 1e3:>10.2f}"
+                  f"{best_of(looked_up) * 1e3:>11.3f}{diff:>10.1e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+# Time to the first metric and to the complete Revenue page, from the rerun
+# trace, with the charts computed on the script thread between draws
+# (--workers 0) and on background threads. The app runs under Streamlit's
+# AppTest against an in-process S3 stand-in (moto); every run picks a new
+# start date, so the charts are computed rather than served from the caches.
+#
+#   python -m benchmarks.bench_progressive --scale 5 --runs 5 --workers 0 1
+import argparse
+import os
+import statistics
+from pathlib import Path
+
+import boto3
+import pandas as pd
+import streamlit_option_menu
+from moto import mock_aws
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.synthetic import make_datasets
+from data_loader import BUCKET_NAME, DATASET_KEYS
+
+APP = str(Path(__file__).resolve().parent.parent / 'app_updated_v3.py')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scale', type=float, default=5.0)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 1])
+    args = parser.parse_args()
+
+    # The sidebar menu is a custom component AppTest cannot click: open the Revenue page directly
+    streamlit_option_menu.option_menu = lambda *args, **kwargs: 'Revenue'
+    with mock_aws():
+        s3_client = boto3.client('s3', region_name='us-east-1')
+        s3_client.create_bucket(Bucket=BUCKET_NAME)
+        for name, df in make_datasets(args.scale).items():
+            s3_client.put_object(Bucket=BUCKET_NAME, Key=DATASET_KEYS[name], Body=df.to_csv(index=False).encode())
+
+        at = AppTest.from_file(APP, default_timeout=600)
+        at.session_state['authenticated'] = True
+        at.run()
+        first_day = pd.Timestamp(at.sidebar.date_input[0].value)
+        print(f"{'workers':>8}{'first metric s':>16}{'complete s':>12}")
+        day = 0
+        for workers in args.workers:
+            os.environ['DASHBOARD_RENDER_WORKERS'] = str(workers)
+            first, complete = [], []
+            for _ in range(args.runs):
+                day += 1
+                at.sidebar.date_input[0].set_value((first_day + pd.Timedelta(days=day)).date())
+                at.run()
+                assert not at.exception, at.exception[0].value
+                milestones = dict(at.session_state['rerun_trace'].runs[-1]['milestones'])
+                first.append(milestones['first metric'])
+                complete.append(milestones['complete'])
+            print(f"{workers:>8}{statistics.median(first):>16.3f}{statistics.median(complete):>12.3f}")
+
+
+if __name__ == '__main__':
+    main()
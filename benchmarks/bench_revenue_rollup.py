@@ -0,0 +1,79 @@
+# Revenue KPIs from the raw invoice rows against the daily rollup: checks the
+# rollup reproduces the page's numbers for random date ranges and times both.
+#
+#   python -m benchmarks.bench_revenue_rollup --rows 2000000
+import argparse
+import time
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_revenue
+from normalize import normalize
+from rollups import build_revenue_rollup, rollup_range
+from schemas import read_dataset
+from time_index import time_slice
+
+
+def raw_kpis(revenue_df, start_date, end_date):
+    filtered_df = time_slice(revenue_df, 'created', start_date, end_date)
+    subscription = filtered_df['description'].str.contains('subscription', case=False, na=False)
+    return {
+        'total': filtered_df['total_invoice_amount'].sum(),
+        'subscription': filtered_df.loc[subscription, 'total_invoice_amount'].sum(),
+        'product': filtered_df.loc[~subscription, 'total_invoice_amount'].sum(),
+        'tax': filtered_df['tax'].sum(),
+        'net_by_month': filtered_df.groupby('month_code')['net_amount'].sum(),
+    }
+
+
+def rollup_kpis(rollup, start_date, end_date):
+    filtered_rollup = rollup_range(rollup, start_date, end_date)
+    subscription = filtered_rollup['is_subscription']
+    return {
+        'total': filtered_rollup['total_invoice_amount'].sum(),
+        'subscription': filtered_rollup.loc[subscription, 'total_invoice_amount'].sum(),
+        'product': filtered_rollup.loc[~subscription, 'total_invoice_amount'].sum(),
+        'tax': filtered_rollup['tax'].sum(),
+        'net_by_month': filtered_rollup.groupby('month_code')['net_amount'].sum(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--ranges', type=int, default=20)
+    args = parser.parse_args()
+
+    raw = make_revenue(args.rows)
+    # Edge cases the rollup must keep: rows exactly at midnight and missing descriptions
+    raw.loc[::97, 'created'] = raw.loc[::97, 'created'].str[:10] + ' 00:00:00'
+    raw.loc[::89, 'description'] = None
+    revenue_df = normalize('revenue', read_dataset(StringIO(raw.to_csv(index=False)), 'revenue'))
+
+    started = time.perf_counter()
+    rollup = build_revenue_rollup(revenue_df)
+    build_s = time.perf_counter() - started
+    print(f"rollup: {len(rollup)} rows from {len(revenue_df)} in {build_s:.2f}s")
+
+    rng = np.random.default_rng(0)
+    days = revenue_df['date'].dropna().unique()
+    raw_s = rollup_s = 0.0
+    for _ in range(args.ranges):
+        start_date, end_date = sorted(rng.choice(days, 2))
+        started = time.perf_counter()
+        expected = raw_kpis(revenue_df, start_date, end_date)
+        raw_s += time.perf_counter() - started
+        started = time.perf_counter()
+        actual = rollup_kpis(rollup, start_date, end_date)
+        rollup_s += time.perf_counter() - started
+        for key in ('total', 'subscription', 'product', 'tax'):
+            assert round(expected[key], 2) == round(actual[key], 2), (key, expected[key], actual[key])
+        pd.testing.assert_series_equal(expected['net_by_month'], actual['net_by_month'])
+    print(f"{args.ranges} ranges match; raw {raw_s / args.ranges * 1e3:.1f} ms, "
+          f"rollup {rollup_s / args.ranges * 1e3:.1f} ms per range")
+
+
+if __name__ == '__main__':
+    main()
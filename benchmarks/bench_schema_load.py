@@ -0,0 +1,53 @@
+# Parse time and memory of an untyped read_csv (what the pages used to do,
+# followed by their own pd.to_datetime calls) against the schema-driven read.
+#
+#   python -m benchmarks.bench_schema_load --scale 1 --extra-columns 40
+import argparse
+import time
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_datasets
+from schemas import SCHEMAS, read_dataset
+
+
+def widen(df, extra_columns, seed=0):
+    # Stripe exports carry many columns the dashboard never reads
+    rng = np.random.default_rng(seed)
+    for i in range(extra_columns):
+        df[f'metadata_{i}'] = rng.integers(0, 1000, len(df)).astype(str)
+    return df
+
+
+def read_untyped(content, name):
+    df = pd.read_csv(StringIO(content))
+    for column in SCHEMAS[name]['dates']:
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column], errors='coerce')
+    return df
+
+
+def measure(fn):
+    started = time.perf_counter()
+    df = fn()
+    return time.perf_counter() - started, df.memory_usage(deep=True).sum() / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scale', type=float, default=1.0)
+    parser.add_argument('--extra-columns', type=int, default=40)
+    args = parser.parse_args()
+
+    print(f"{'dataset':<14}{'before s':>10}{'after s':>10}{'before MB':>11}{'after MB':>10}")
+    for name, df in make_datasets(args.scale).items():
+        content = widen(df, args.extra_columns).to_csv(index=False)
+        before_s, before_mb = measure(lambda: read_untyped(content, name))
+        after_s, after_mb = measure(lambda: read_dataset(StringIO(content), name))
+        print(f"{name:<14}{before_s:>10.3f}{after_s:>10.3f}{before_mb:>11.1f}{after_mb:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+# Peak-RSS comparison of the old read()/decode()/StringIO load against parsing
+# the S3 streaming body directly, on a large synthetic revenue export.
+#
+#   python -m benchmarks.bench_stream_rss --size-mb 1024
+#
+# Each method runs in a fresh subprocess so its peak RSS is measured in isolation.
+# The CSV is served through botocore's StreamingBody, the same wrapper get_object
+# returns, reading from a local file instead of the network.
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from io import StringIO
+
+import pandas as pd
+from botocore.response import StreamingBody
+
+
+def write_csv(path, size_mb):
+    from benchmarks.synthetic import make_revenue
+    chunk = make_revenue(200_000)
+    with open(path, 'w') as f:
+        chunk.to_csv(f, index=False)
+        while f.tell() < size_mb * 1024 * 1024:
+            chunk.to_csv(f, index=False, header=False)
+
+
+def open_body(path):
+    return StreamingBody(open(path, 'rb'), os.path.getsize(path))
+
+
+def load_buffered(path):
+    content = open_body(path).read().decode('utf-8')
+    return pd.read_csv(StringIO(content))
+
+
+def load_streaming(path):
+    return pd.read_csv(open_body(path))
+
+
+METHODS = {'buffered': load_buffered, 'streaming': load_streaming}
+
+
+def run_one(method, path):
+    started = time.perf_counter()
+    df = METHODS[method](path)
+    elapsed = time.perf_counter() - started
+    # ru_maxrss is reported in kilobytes on Linux
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    frame_mb = df.memory_usage(deep=True).sum() / 1024 / 1024
+    print(f"{method:<10}{len(df):>12}{frame_mb:>11.0f}{peak_mb:>11.0f}{elapsed:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size-mb', type=int, default=1024)
+    parser.add_argument('--path', default=os.path.join(tempfile.gettempdir(), 'revenue_rss_bench.csv'))
+    parser.add_argument('--method', choices=METHODS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.method:
+        run_one(args.method, args.path)
+        return
+
+    if not os.path.exists(args.path) or os.path.getsize(args.path) < args.size_mb * 1024 * 1024:
+        print(f"writing {args.size_mb} MB synthetic export to {args.path}")
+        write_csv(args.path, args.size_mb)
+    print(f"{'method':<10}{'rows':>12}{'frame MB':>11}{'peak MB':>11}{'time s':>9}")
+    for method in METHODS:
+        subprocess.run([sys.executable, '-m', 'benchmarks.bench_stream_rss', '--method', method, '--path', args.path],
+                       check=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+# Monthly and daily counts grouped on strftime strings against grouping on
+# time_buckets' integer codes and labelling only the grouped rows.
+#
+#   python -m benchmarks.bench_time_buckets --rows 5000000
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from time_buckets import day_codes, day_labels, month_codes, month_labels
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    created = pd.Series(pd.Timestamp('2022-01-01') + pd.to_timedelta(rng.integers(0, 3 * 365 * 86400, args.rows), unit='s'))
+    created[::1000] = pd.NaT
+
+    buckets = {
+        'month': (lambda: created.dt.strftime('%Y-%m'), month_codes, month_labels),
+        'day': (lambda: created.dt.strftime('%Y-%m-%d'), day_codes, day_labels),
+    }
+    print(f"{'bucket':>8}{'strftime + groupby s':>22}{'codes + groupby s':>19}{'groups':>8}")
+    for bucket, (strings, codes, labels) in buckets.items():
+        expected, strftime_s = timed(lambda: created.groupby(strings()).size())
+        counts, codes_s = timed(lambda: created.groupby(codes(created)).size())
+        actual = pd.Series(counts.to_numpy(), index=labels(counts.index.to_series()).to_numpy())
+        pd.testing.assert_series_equal(expected, actual, check_names=False, check_index_type=False)
+        print(f"{bucket:>8}{strftime_s:>22.2f}{codes_s:>19.3f}{len(counts):>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+# Date-range filtering on a large revenue table: boolean mask and DataFrame.query
+# (what the pages used to do) against time_slice on the time-sorted frame.
+#
+#   python -m benchmarks.bench_time_slice --rows 10000000
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from time_index import time_slice
+
+
+def best_of(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    offsets = np.sort(rng.integers(0, 365 * 86400, args.rows))
+    df = pd.DataFrame({
+        'created': pd.Timestamp('2024-01-01') + pd.to_timedelta(offsets, unit='s'),
+        'net_amount': rng.random(args.rows) * 100,
+    })
+
+    print(f"{'window days':>12}{'rows':>12}{'mask ms':>10}{'query ms':>10}{'slice ms':>10}")
+    for days in (1, 7, 30, 180, 365):
+        start = pd.Timestamp('2024-03-01')
+        end = start + pd.Timedelta(days=days)
+        mask = lambda: df[(df['created'] >= start) & (df['created'] <= end)]
+        query = lambda: df.query("created >= @start and created <= @end", local_dict={"start": start, "end": end})
+        sliced = lambda: time_slice(df, 'created', start, end)
+        assert len(mask()) == len(sliced())
+        print(f"{days:>12}{len(sliced()):>12}{best_of(mask) * 1e3:>10.2f}"
+              f"{best_of(query) * 1e3:>10.2f}{best_of(sliced) * 1e3:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# The Revenue VIEW DATA table for a large selection: the Arrow payload
+# st.dataframe sends for the whole filtered frame, against one page cut by
+# table_pages, unsorted and sorted through a SortIndex.
+#
+#   python -m benchmarks.bench_view_data --rows 2000000
+import argparse
+import time
+
+import pandas as pd
+from streamlit.dataframe_util import convert_pandas_df_to_arrow_bytes
+
+from benchmarks.synthetic import make_revenue
+from normalize import normalize
+from schemas import apply_schema
+from table_pages import SortIndex, table_page
+from time_index import time_bounds
+
+CHUNK_ROWS = 500_000
+COLUMNS = ['created', 'customer_id', 'email', 'phone', 'name', 'subscription', 'invoice_number', 'description',
+           'quantity', 'currency', 'line_item_amount', 'total_invoice_amount', 'discount', 'fee', 'tax', 'net_amount']
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--page-rows', type=int, default=100)
+    parser.add_argument('--sort-by', default='net_amount')
+    args = parser.parse_args()
+
+    raw = pd.concat([make_revenue(min(CHUNK_ROWS, args.rows - start), seed=start)
+                     for start in range(0, args.rows, CHUNK_ROWS)], ignore_index=True)
+    revenue_df = normalize('revenue', apply_schema(raw, 'revenue'))
+    del raw
+    lo, hi = time_bounds(revenue_df, 'created', revenue_df['created'].min(), revenue_df['created'].max())
+    filtered_df = revenue_df.iloc[lo:hi]
+    print(f"{len(filtered_df):,} rows selected, {len(COLUMNS)} columns shown")
+
+    payload, full_s = timed(lambda: convert_pandas_df_to_arrow_bytes(filtered_df[COLUMNS]))
+    print(f"{'whole selection':>28}: {len(payload) / 2 ** 20:9.1f} MB in {full_s:7.3f}s")
+    del payload
+
+    index = SortIndex(revenue_df)
+    cases = {
+        'page, date order': lambda: table_page(filtered_df, 0, args.page_rows),
+        f'page, {args.sort_by} (first use)': lambda: table_page(filtered_df, 0, args.page_rows, args.sort_by, False, index, lo),
+        f'page, {args.sort_by}': lambda: table_page(filtered_df, 0, args.page_rows, args.sort_by, False, index, lo),
+    }
+    for name, page in cases.items():
+        payload, page_s = timed(lambda: convert_pandas_df_to_arrow_bytes(page()[COLUMNS]))
+        print(f"{name:>28}: {len(payload) / 2 ** 10:9.1f} KB in {page_s:7.3f}s")
+    expected = filtered_df.sort_values(args.sort_by, ascending=False, kind='stable').head(args.page_rows)
+    assert table_page(filtered_df, 0, args.page_rows, args.sort_by, False, index, lo).index.equals(expected.index)
+
+
+if __name__ == '__main__':
+    main()
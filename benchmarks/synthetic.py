@@ -0,0 +1,127 @@
+# Synthetic stand-ins for the dashboard CSV exports, shaped like the real columns
+import numpy as np
+import pandas as pd
+
+DESCRIPTIONS = [
+    'Monthly Subscription', 'Annual Subscription', 'Subscription Renewal',
+    'Setup Fee', 'Starter Kit', 'Extra Seats Add-on', 'Consulting Hour', 'Gift Card',
+]
+CURRENCIES = ['usd', 'eur', 'gbp']
+PLANS = ['basic', 'pro', 'enterprise']
+STATUSES = ['active', 'trialing', 'past_due', 'canceled', 'paused', 'incomplete_expired']
+CITIES = ['London', 'New York', 'Berlin', 'Paris', 'Toronto', 'Sydney', 'Austin', 'Dublin']
+COUNTRIES = ['GB', 'US', 'DE', 'FR', 'CA', 'AU', 'IE']
+
+
+def _dates(rng, n, start='2024-01-01', days=180):
+    offsets = rng.integers(0, days * 86400, n)
+    return pd.Timestamp(start) + pd.to_timedelta(offsets, unit='s')
+
+
+def make_revenue(n, seed=0):
+    rng = np.random.default_rng(seed)
+    customers = rng.integers(0, max(n // 4, 1), n)
+    amount = rng.integers(500, 50000, n) / 100
+    tax = (amount * 0.2).round(2)
+    fee = (amount * 0.03).round(2)
+    return pd.DataFrame({
+        'created': _dates(rng, n).strftime('%Y-%m-%d %H:%M:%S'),
+        'customer_id': np.char.add('cus_', customers.astype(str)),
+        'email': np.char.add(customers.astype(str), '@example.com'),
+        'phone': '555-0100',
+        'name': np.char.add('Customer ', customers.astype(str)),
+        'subscription': np.char.add('sub_', rng.integers(0, max(n // 8, 1), n).astype(str)),
+        'subscription_plan': rng.choice(PLANS, n),
+        'invoice_number': np.char.add('INV-', np.arange(n).astype(str)),
+        'description': rng.choice(DESCRIPTIONS, n),
+        'quantity': rng.integers(1, 5, n),
+        'currency': rng.choice(CURRENCIES, n),
+        'line_item_amount': amount,
+        'total_invoice_amount': amount,
+        'discount': 0.0,
+        'fee': fee,
+        'tax': tax,
+        'net_amount': (amount - tax - fee).round(2),
+    })
+
+
+def make_customers(n, seed=1):
+    rng = np.random.default_rng(seed)
+    ids = np.arange(n).astype(str)
+    return pd.DataFrame({
+        'id': np.char.add('cus_', ids),
+        'created': _dates(rng, n).strftime('%Y-%m-%d %H:%M:%S'),
+        'name': np.char.add('Customer ', ids),
+        'email': np.char.add(ids, '@example.com'),
+        'phone': '555-0100',
+        'shipping_address_city': rng.choice(CITIES, n),
+        'shipping_address_country': rng.choice(COUNTRIES, n),
+    })
+
+
+def make_subscriptions(n, n_customers=None, seed=2):
+    rng = np.random.default_rng(seed)
+    n_customers = n_customers or max(n // 3, 1)
+    created = _dates(rng, n)
+    trial_start = created
+    trial_end = created + pd.to_timedelta(rng.integers(7, 31, n), unit='D')
+    canceled = pd.Series(created + pd.to_timedelta(rng.integers(30, 120, n), unit='D'))
+    canceled[rng.random(n) < 0.7] = pd.NaT
+    fmt = '%Y-%m-%d %H:%M:%S'
+    return pd.DataFrame({
+        'id': np.char.add('sub_', np.arange(n).astype(str)),
+        'customer_id': np.char.add('cus_', rng.integers(0, n_customers, n).astype(str)),
+        'status': rng.choice(STATUSES, n),
+        'created': created.strftime(fmt),
+        'start': created.strftime(fmt),
+        'trial_start': trial_start.strftime(fmt),
+        'trial_end': trial_end.strftime(fmt),
+        'canceled_at': canceled.dt.strftime(fmt),
+    })
+
+
+def make_payments(n, seed=3):
+    rng = np.random.default_rng(seed)
+    amount = rng.integers(500, 50000, n) / 100
+    refunded = rng.random(n) < 0.05
+    status = np.where(rng.random(n) < 0.9, 'succeeded', 'failed')
+    return pd.DataFrame({
+        'id': np.char.add('ch_', np.arange(n).astype(str)),
+        'amount': amount,
+        'amount_refunded': np.where(refunded, amount, 0.0),
+        'balance_transaction_id': np.char.add('txn_', np.arange(n).astype(str)),
+        'calculated_statement_descriptor': 'BRAINTAP',
+        'created_date': _dates(rng, n).strftime('%Y-%m-%d'),
+        'currency': rng.choice(CURRENCIES, n),
+        'customer_id': np.char.add('cus_', rng.integers(0, max(n // 4, 1), n).astype(str)),
+        'description': rng.choice(DESCRIPTIONS, n),
+        'status': status,
+        'refunded': refunded,
+        'failure_code': np.where(status == 'failed', rng.choice(['card_declined', 'expired_card', 'insufficient_funds'], n), None),
+    })
+
+
+def make_financial(n_months=24, seed=4):
+    rng = np.random.default_rng(seed)
+    sales = rng.integers(50000, 150000, n_months).astype(float)
+    refunds = (sales * rng.uniform(0.01, 0.05, n_months)).round(2)
+    payouts = (sales * 0.8).round(2)
+    return pd.DataFrame({
+        'month': pd.date_range('2023-01-01', periods=n_months, freq='MS').strftime('%Y-%m-%d'),
+        'currency': 'usd',
+        'total_sales': sales,
+        'total_refunds': refunds,
+        'total_payouts': payouts,
+        'net_profit_loss': (sales - refunds - payouts).round(2),
+    })
+
+
+def make_datasets(scale=1.0):
+    # Row counts roughly matching the production exports at scale=1
+    return {
+        'revenue': make_revenue(int(200_000 * scale)),
+        'customers': make_customers(int(50_000 * scale)),
+        'subscriptions': make_subscriptions(int(80_000 * scale), int(50_000 * scale)),
+        'payments': make_payments(int(100_000 * scale)),
+        'financial': make_financial(),
+    }
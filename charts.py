@@ -0,0 +1,165 @@
+# Bar, trend, pie and line figures built straight from the frames' arrays.
+# They produce the same figures as the Plotly Express calls they replace
+# (traces, hover text, axis titles, colours and the default template), but
+# skip Express' frame wrangling and the per-property validation of
+# graph_objects. The layout shared by every chart is built once.
+import copy
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+
+# Templates resolved once by name; figures hold a reference, and to_dict() copies it
+_templates = {}
+
+
+def template(name):
+    if name not in _templates:
+        _templates[name] = pio.templates[name].to_plotly_json()
+    return _templates[name]
+
+
+COLORS = template(pio.templates.default)['layout']['colorway']
+
+
+def _values(column):
+    # Plain lists become arrays as well, as px turns every argument into a frame column
+    if hasattr(column, 'to_numpy'):
+        return column.to_numpy()
+    if isinstance(column, (list, tuple)):
+        values = np.asarray(column)
+        return values.astype(object) if values.dtype.kind == 'U' else values
+    return column
+
+
+def _label(labels, name):
+    return (labels or {}).get(name, name)
+
+
+def _axes(x_title, y_title):
+    return {
+        'xaxis': {'anchor': 'y', 'domain': [0.0, 1.0], 'title': {'text': x_title}},
+        'yaxis': {'anchor': 'x', 'domain': [0.0, 1.0], 'title': {'text': y_title}},
+    }
+
+
+def _figure(data, layout, title, width=None, height=None, legend_title=None, update_layout=None):
+    layout = {**layout, 'template': template(pio.templates.default), 'legend': {'tracegroupgap': 0}}
+    if legend_title is not None:
+        layout['legend']['title'] = {'text': legend_title}
+    if title is None:
+        layout['margin'] = {'t': 60}
+    else:
+        layout['title'] = {'text': title}
+    if width is not None:
+        layout['width'] = width
+    if height is not None:
+        layout['height'] = height
+    for key, value in (update_layout or {}).items():
+        # Merged into the axis, legend or margin settings like update_layout() does
+        if key == 'template':
+            layout[key] = template(value)
+        elif isinstance(value, dict) and isinstance(layout.get(key), dict):
+            layout[key] = {**layout[key], **copy.deepcopy(value)}
+        else:
+            layout[key] = value
+    return go.Figure({'data': data, 'layout': layout}, _validate=False)
+
+
+def bar(df, x, y, title=None, labels=None, orientation='v', text=None, width=None, height=None,
+        color_discrete_sequence=None, update_traces=None, update_layout=None):
+    """Same figure as ``px.bar(df, x=x, y=y, ...)``.
+
+    ``y`` may be a list of columns, drawn as one coloured trace each. With
+    ``orientation='h'`` the bars run along ``x`` (px infers this when ``x`` is
+    numeric and ``y`` is not). ``update_traces`` and ``update_layout`` are
+    applied as if the figure had been updated after building it.
+    """
+    data, layout, legend_title = _bar(df, x, y, labels, orientation, text, color_discrete_sequence, update_traces)
+    return _figure(data, layout, title, width, height, legend_title, update_layout)
+
+
+def _bar(df, x, y, labels=None, orientation='v', text=None, color_discrete_sequence=None, update_traces=None):
+    colors = color_discrete_sequence or COLORS
+    value_axis = 'x' if orientation == 'h' else 'y'
+    columns = y if isinstance(y, list) else [y]
+    data = []
+    for i, column in enumerate(columns):
+        trace = {
+            'legendgroup': '', 'marker': {'color': colors[i % len(colors)], 'pattern': {'shape': ''}}, 'name': '',
+            'orientation': orientation, 'showlegend': False, 'textposition': 'auto',
+            'x': _values(df[x]), 'xaxis': 'x', 'y': _values(df[column]), 'yaxis': 'y', 'type': 'bar',
+        }
+        value = '%{text}' if text is not None else '%{' + value_axis + '}'
+        if isinstance(y, list):
+            trace.update(legendgroup=column, name=column, showlegend=True)
+            trace['hovertemplate'] = f"variable={column}<br>{_label(labels, x)}=%{{x}}<br>value={value}<extra></extra>"
+        elif orientation == 'h':
+            trace['hovertemplate'] = f"{_label(labels, x)}={value}<br>{_label(labels, y)}=%{{y}}<extra></extra>"
+        else:
+            trace['hovertemplate'] = f"{_label(labels, x)}=%{{x}}<br>{_label(labels, y)}={value}<extra></extra>"
+        if text is not None:
+            trace['text'] = _values(df[text])
+        trace.update(update_traces or {})
+        data.append(trace)
+    y_title = 'value' if isinstance(y, list) else _label(labels, y)
+    layout = {**_axes(_label(labels, x), y_title), 'barmode': 'relative'}
+    return data, layout, 'variable' if isinstance(y, list) else None
+
+
+def trend_bar(df, x, y, title=None, labels=None, hovertext=None, update_layout=None):
+    """``bar()`` with a 'Trend' line over the same points, its hover text from ``hovertext``.
+
+    Same figure as ``px.bar`` followed by ``add_scatter(mode='lines+markers')``.
+    """
+    data, layout, legend_title = _bar(df, x, y, labels)
+    data.append({
+        'hoverinfo': 'text', 'hovertext': _values(hovertext), 'mode': 'lines+markers', 'name': 'Trend',
+        'x': _values(df[x]), 'y': _values(df[y]), 'type': 'scatter',
+    })
+    return _figure(data, layout, title, legend_title=legend_title, update_layout=update_layout)
+
+
+def pie(df, names, values, title=None, labels=None, hole=None, update_traces=None, update_layout=None):
+    """Same figure as ``px.pie(df, names=names, values=values, ...)``.
+
+    Without a frame, ``names`` and ``values`` are the arrays themselves and
+    are labelled 'label' and 'value' in the hover text, as px does.
+    """
+    if df is None:
+        names_label, values_label = _label(labels, 'label'), _label(labels, 'value')
+    else:
+        names_label, values_label = _label(labels, names), _label(labels, values)
+        names, values = df[names], df[values]
+    trace = {
+        'domain': {'x': [0.0, 1.0], 'y': [0.0, 1.0]},
+        'hovertemplate': f"{names_label}=%{{label}}<br>{values_label}=%{{value}}<extra></extra>",
+        'labels': _values(names), 'legendgroup': '', 'name': '', 'showlegend': True, 'values': _values(values),
+        'type': 'pie',
+    }
+    if hole is not None:
+        trace['hole'] = hole
+    trace.update(update_traces or {})
+    return _figure([trace], {}, title, update_layout=update_layout)
+
+
+def line(df, x, y, color, title=None, update_traces=None, update_layout=None):
+    """Same figure as ``px.line(df, x=x, y=y, color=color, ...)``: one trace per ``color`` value, in order of appearance.
+
+    Like px, frames over 1000 rows are drawn with WebGL (``scattergl``).
+    """
+    webgl = len(df) > 1000
+    data = []
+    groups = df.groupby(color, sort=False)
+    for i, (group, rows) in enumerate(groups):
+        trace = {
+            'hovertemplate': f"{color}={group}<br>{x}=%{{x}}<br>{y}=%{{y}}<extra></extra>", 'legendgroup': group,
+            'line': {'color': COLORS[i % len(COLORS)], 'dash': 'solid'}, 'marker': {'symbol': 'circle'},
+            'mode': 'lines', 'name': group, 'orientation': 'v', 'showlegend': True, 'x': _values(rows[x]),
+            'xaxis': 'x', 'y': _values(rows[y]), 'yaxis': 'y', 'type': 'scattergl' if webgl else 'scatter',
+        }
+        if webgl:
+            del trace['orientation']
+        trace.update(update_traces or {})
+        data.append(trace)
+    return _figure(data, _axes(x, y), title, legend_title=color, update_layout=update_layout)
@@ -0,0 +1,113 @@
+# Helpers for fetching the dashboard datasets from S3
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+import pandas as pd
+from botocore.exceptions import ClientError
+
+from schemas import read_dataset
+
+logger = logging.getLogger(__name__)
+
+BUCKET_NAME = 'braintaprawdata'
+
+# Dataset name -> S3 key for every CSV the dashboard reads
+DATASET_KEYS = {
+    'revenue': 'dashboard_processed_files/KPI_Revenue_total_counts.csv',
+    'customers': 'dashboard_processed_files/customers_6months.csv',
+    'subscriptions': 'dashboard_processed_files/subscriptions_6months.csv',
+    'payments': 'payments_outcome_data.csv',
+    'financial': 'financial.csv',
+}
+
+# Upper bound on simultaneous S3 downloads
+MAX_WORKERS = 5
+
+# Seconds a loaded dataset is trusted before it is revalidated against S3
+DATASET_TTLS = {
+    'revenue': 6 * 3600,
+    'customers': 6 * 3600,
+    'subscriptions': 6 * 3600,
+    'payments': 3600,  # payments_outcome_data.csv is refreshed hourly
+    'financial': 24 * 3600,  # financial.csv changes monthly
+}
+
+
+def is_not_modified(error):
+    # S3 answers a conditional GET whose ETag still matches with a 304
+    return error.response['Error']['Code'] in ('304', 'NotModified')
+
+
+def fetch_csv(s3_client, key, bucket_name=BUCKET_NAME, etag=None, name=None):
+    """Download one object and parse it, returning ``(df, timing)``.
+
+    ``name`` selects the dataset schema used to parse the CSV. When ``etag``
+    is given the GET is conditional; if the object is unchanged S3 sends no
+    body and ``df`` is None.
+    """
+    started = time.perf_counter()
+    params = {'Bucket': bucket_name, 'Key': key}
+    if etag:
+        params['IfNoneMatch'] = etag
+    try:
+        response = s3_client.get_object(**params)
+    except ClientError as e:
+        if not is_not_modified(e):
+            raise
+        elapsed = time.perf_counter() - started
+        timing = {'key': key, 'etag': etag, 'not_modified': True, 'bytes': 0, 'rows': 0,
+                  'fetch_s': elapsed, 'parse_s': 0.0, 'total_s': elapsed}
+        return None, timing
+    # The body is parsed as it streams in, so no full-text copy is ever held;
+    # fetch_s is the time to the response headers and parse_s covers the download
+    fetched = time.perf_counter()
+    df = read_dataset(response['Body'], name) if name else pd.read_csv(response['Body'])
+    parsed = time.perf_counter()
+    timing = {
+        'key': key,
+        'etag': response.get('ETag'),
+        'last_modified': response.get('LastModified'),
+        'not_modified': False,
+        'bytes': response['ContentLength'],
+        'rows': len(df),
+        'fetch_s': fetched - started,
+        'parse_s': parsed - fetched,
+        'total_s': parsed - started,
+    }
+    return df, timing
+
+
+def load_datasets(names=None, s3_client=None, bucket_name=BUCKET_NAME, max_workers=MAX_WORKERS, etags=None):
+    """Download and parse datasets concurrently on a bounded thread pool.
+
+    Returns ``(frames, timings)``, both keyed by dataset name. ``timings``
+    also carries a ``'_wall'`` entry with the elapsed time of the whole batch.
+    Datasets listed in ``etags`` are fetched conditionally and left out of
+    ``frames`` when S3 reports them unchanged.
+    """
+    names = list(DATASET_KEYS) if names is None else list(names)
+    etags = etags or {}
+    # boto3 clients are thread-safe, so one client is shared by all workers
+    s3_client = s3_client or boto3.client('s3')
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(names)) or 1) as pool:
+        futures = {name: pool.submit(fetch_csv, s3_client, DATASET_KEYS[name], bucket_name, etags.get(name), name)
+                   for name in names}
+        results = {name: future.result() for name, future in futures.items()}
+    wall = time.perf_counter() - started
+
+    frames = {name: df for name, (df, _) in results.items() if df is not None}
+    timings = {name: timing for name, (_, timing) in results.items()}
+    timings['_wall'] = {'total_s': wall}
+
+    for name in names:
+        t = timings[name]
+        if t['not_modified']:
+            logger.info("%s unchanged (ETag %s), revalidated in %.3fs", name, t['etag'], t['fetch_s'])
+        else:
+            logger.info("loaded %s: %d rows, fetch %.3fs, parse %.3fs", name, t['rows'], t['fetch_s'], t['parse_s'])
+    logger.info("loaded %d datasets in %.3fs", len(names), wall)
+    return frames, timings
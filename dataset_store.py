@@ -0,0 +1,308 @@
+# Process-wide store for the dashboard datasets, shared by every Streamlit session
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from data_loader import BUCKET_NAME, DATASET_KEYS, DATASET_TTLS, load_datasets
+from normalize import normalize
+
+logger = logging.getLogger(__name__)
+
+
+class DatasetStore:
+    """Loads each dataset once and hands sessions read-only views of it.
+
+    Frames are normalized once per version (see normalize.py) and sessions
+    get shallow copies, so a stray column assignment in page code lands on
+    the copy and never touches the shared frames. Once a dataset is
+    older than its TTL it is revalidated with a conditional GET on its ETag
+    and only downloaded and parsed again if S3 reports a change.
+
+    With a ``mirror`` every downloaded dataset is also written to local disk,
+    and a cold store first asks S3 whether the mirrored ETag is still
+    current before downloading anything.
+
+    Each dataset has its own lock, so loading one never blocks a session
+    that only needs another; ``prefetch`` warms datasets in the background.
+    """
+
+    def __init__(self, s3_client=None, bucket_name=BUCKET_NAME, ttls=None, mirror=None):
+        self.s3_client = s3_client
+        self.mirror = mirror
+        self.bucket_name = bucket_name
+        self.ttls = {**DATASET_TTLS, **(ttls or {})}
+        # Guards the entries and counters; held only briefly
+        self._lock = threading.Lock()
+        # Held while a dataset is checked or loaded
+        self._dataset_locks = {name: threading.Lock() for name in DATASET_KEYS}
+        self._prefetcher = ThreadPoolExecutor(max_workers=2, thread_name_prefix='dataset-prefetch')
+        # name -> {'df', 'etag', 'bytes', 'checked_at', 'version', 'derived', 'building'}
+        self._entries = {}
+        self.timings = {}
+        self.load_counts = Counter()
+        # hits: fresh, served without contacting S3
+        # misses: not loaded yet
+        # revalidated: stale but unchanged on S3 (304, no body transferred)
+        # refreshed: stale and changed on S3, downloaded again
+        # mirror_hits: not loaded yet, read from the local mirror after a 304
+        # prefetches: loaded in the background before any session asked
+        # derived_builds: per-version values built and kept (see ``derived``)
+        # derived_superseded: per-version values built for a caller served an older version, not kept
+        self.counters = Counter()
+        self.bytes_downloaded = 0
+        self.bytes_saved = 0
+        self.served = 0
+
+    def _is_fresh(self, name, now):
+        return now - self._entries[name]['checked_at'] < self.ttls.get(name, 0)
+
+    def get(self, names=None):
+        return self.snapshot(names)[0]
+
+    def snapshot(self, names=None):
+        # Frames together with the version numbers they were served at
+        names = list(DATASET_KEYS) if names is None else list(names)
+        self._refresh(names)
+        with self._lock:
+            self.served += 1
+            frames = {name: self._entries[name]['df'].copy(deep=False) for name in names}
+            return frames, {name: self._entries[name]['version'] for name in names}
+
+    def prefetch(self, names):
+        # Load datasets that are not in memory yet on background threads
+        for name in names:
+            if name not in self._entries:
+                try:
+                    self._prefetcher.submit(self._prefetch_one, name)
+                except RuntimeError:
+                    # The executor is shut down (interpreter exit): nothing left to warm
+                    return
+
+    def _prefetch_one(self, name):
+        try:
+            self._refresh([name], prefetch=True)
+        except Exception:
+            # The session that needs it will retry and surface the error
+            logger.exception("prefetch of %s failed", name)
+
+    def _refresh(self, names, prefetch=False):
+        # Lock in a fixed order so concurrent multi-dataset requests cannot deadlock
+        locks = [self._dataset_locks[name] for name in sorted(names)]
+        for lock in locks:
+            lock.acquire()
+        try:
+            now = time.monotonic()
+            missing = [name for name in names if name not in self._entries]
+            stale = [name for name in names if name in self._entries and not self._is_fresh(name, now)]
+            if prefetch:
+                stale = []
+            with self._lock:
+                if not prefetch:
+                    self.counters['hits'] += len(names) - len(missing) - len(stale)
+                self.counters['prefetches' if prefetch else 'misses'] += len(missing)
+            if missing or stale:
+                etags = {name: self._entries[name]['etag'] for name in stale}
+                if self.mirror is not None:
+                    for name in missing:
+                        etag = self.mirror.etag_for(DATASET_KEYS[name])
+                        if etag:
+                            etags[name] = etag
+                self._load(missing + stale, etags)
+        finally:
+            for lock in locks:
+                lock.release()
+
+    def _load(self, names, etags):
+        frames, timings = load_datasets(names, s3_client=self.s3_client, bucket_name=self.bucket_name, etags=etags)
+        frames.update(self._load_mirrored(names, timings))
+        checked_at = time.monotonic()
+        for name in names:
+            timing = timings[name]
+            if not timing['not_modified'] and self.mirror is not None:
+                self.mirror.save(DATASET_KEYS[name], timing['etag'], frames[name])
+            if name in frames:
+                # Derived columns are built once per dataset version, not per rerun
+                started = time.perf_counter()
+                frames[name] = normalize(name, frames[name])
+                timing['normalize_s'] = time.perf_counter() - started
+        with self._lock:
+            for name in names:
+                self._update_entry(name, frames.get(name), timings[name], checked_at)
+            counters = self._counters()
+        # Only the counters: deep memory usage scans every object column, kept out of the locks
+        logger.info("dataset store updated %s; %s", names, counters)
+
+    def _update_entry(self, name, df, timing, checked_at):
+        self.timings[name] = timing
+        if timing['not_modified'] and name in self._entries:
+            entry = self._entries[name]
+            entry['checked_at'] = checked_at
+            self.counters['revalidated'] += 1
+            self.bytes_saved += entry['bytes']
+            return
+        if timing['not_modified']:
+            self.counters['mirror_hits'] += 1
+        elif name in self._entries:
+            self.counters['refreshed'] += 1
+        if not timing['not_modified']:
+            self.bytes_downloaded += timing['bytes']
+        previous = self._entries.get(name)
+        self._entries[name] = {
+            'df': df,
+            'etag': timing['etag'],
+            'bytes': timing['bytes'],
+            'checked_at': checked_at,
+            # Bumped on every new version; derived values are dropped with the old entry
+            'version': previous['version'] + 1 if previous else 1,
+            'derived': {},
+            # key -> Event set once the derived value being built is published or its build failed
+            'building': {},
+        }
+        self.load_counts[name] += 1
+
+    def version(self, name):
+        # Version number of the dataset currently served, 0 if not loaded
+        entry = self._entries.get(name)
+        return entry['version'] if entry else 0
+
+    def derived(self, name, key, build, df, expected_version):
+        """Value computed by ``build(df)`` once per version of dataset ``name``.
+
+        Used for aggregates and indexes built from a whole dataset; every
+        session shares the result until the dataset changes. ``df`` is the
+        caller's frame and ``expected_version`` the version it was served at
+        (see ``snapshot``): once the store holds a newer version, the value is
+        built for the caller but not kept.
+
+        The build runs outside the store's locks, so loads and snapshots of
+        the dataset carry on meanwhile; sessions asking for a value that is
+        being built wait for that one build.
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(name)
+                current = entry is not None and entry['version'] == expected_version
+                if not current:
+                    self.counters['derived_superseded'] += 1
+                    break
+                if key in entry['derived']:
+                    return entry['derived'][key]
+                pending = entry['building'].get(key)
+                if pending is None:
+                    pending = entry['building'][key] = threading.Event()
+                    break
+            # Published by the other session on the next pass, or built here if that build failed
+            pending.wait()
+        if not current:
+            return build(df)
+
+        try:
+            started = time.perf_counter()
+            value = build(df)
+        except BaseException:
+            with self._lock:
+                del entry['building'][key]
+            pending.set()
+            raise
+        with self._lock:
+            entry['derived'][key] = value
+            del entry['building'][key]
+            self.counters['derived_builds'] += 1
+        pending.set()
+        logger.info("built %s for %s v%d in %.3fs", key, name, expected_version, time.perf_counter() - started)
+        return value
+
+    def derived_from(self, names, key, build, frames, expected_versions):
+        """Value computed by ``build(*frames)`` once per combination of versions of datasets ``names``.
+
+        ``derived`` for values built from several datasets, such as a join. It
+        is kept with the first dataset's derived values, under the versions of
+        the others, and replaces the value built for their previous versions.
+        ``frames`` and ``expected_versions`` map each name to the caller's
+        snapshot; the value is kept only if all of them are still current.
+        """
+        others = tuple(expected_versions[name] for name in names[1:])
+        while True:
+            with self._lock:
+                entries = [self._entries.get(name) for name in names]
+                current = all(entry is not None and entry['version'] == expected_versions[name]
+                              for name, entry in zip(names, entries))
+                if not current:
+                    self.counters['derived_superseded'] += 1
+                    break
+                entry = entries[0]
+                kept = entry['derived'].get(key)
+                if kept is not None and kept[0] == others:
+                    return kept[1]
+                pending = entry['building'].get(key)
+                if pending is None:
+                    pending = entry['building'][key] = threading.Event()
+                    break
+            pending.wait()
+        if not current:
+            return build(*(frames[name] for name in names))
+
+        try:
+            started = time.perf_counter()
+            value = build(*(frames[name] for name in names))
+        except BaseException:
+            with self._lock:
+                del entry['building'][key]
+            pending.set()
+            raise
+        with self._lock:
+            entry['derived'][key] = (others, value)
+            del entry['building'][key]
+            self.counters['derived_builds'] += 1
+        pending.set()
+        logger.info("built %s for %s in %.3fs", key, ', '.join(f"{name} v{expected_versions[name]}" for name in names),
+                    time.perf_counter() - started)
+        return value
+
+    def _load_mirrored(self, names, timings):
+        # Read datasets S3 confirmed unchanged but that are not in memory yet
+        frames = {}
+        for name in names:
+            timing = timings[name]
+            if not timing['not_modified'] or name in self._entries:
+                continue
+            started = time.perf_counter()
+            df = self.mirror.load(DATASET_KEYS[name], timing['etag'])
+            if df is None:
+                # Mirror vanished between the listing and the read; download unconditionally
+                fresh, fresh_timings = load_datasets([name], s3_client=self.s3_client, bucket_name=self.bucket_name)
+                frames[name] = fresh[name]
+                timings[name] = fresh_timings[name]
+                continue
+            frames[name] = df
+            timing['rows'] = len(df)
+            timing['parse_s'] = time.perf_counter() - started
+            timing['total_s'] = timing['fetch_s'] + timing['parse_s']
+        return frames
+
+    def memory_usage(self):
+        # Deep memory usage in bytes of each shared frame, measured outside the lock
+        with self._lock:
+            frames = {name: entry['df'] for name, entry in self._entries.items()}
+        return {name: int(df.memory_usage(deep=True).sum()) for name, df in frames.items()}
+
+    def _counters(self):
+        return {
+            'loads': dict(self.load_counts),
+            'served': self.served,
+            'cache': dict(self.counters),
+            'bytes_downloaded': self.bytes_downloaded,
+            'bytes_saved': self.bytes_saved,
+        }
+
+    def stats(self):
+        with self._lock:
+            stats = self._counters()
+        memory = self.memory_usage()
+        return {
+            **stats,
+            'memory_bytes': memory,
+            'total_memory_bytes': sum(memory.values()),
+        }
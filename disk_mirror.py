@@ -0,0 +1,88 @@
+# Local Parquet mirror of the S3 datasets, so restarts skip CSV parsing
+import glob
+import logging
+import os
+import tempfile
+
+import pandas as pd
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.environ.get('DASHBOARD_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'dashboard_mirror'))
+
+
+class DiskMirror:
+    """Parquet copies of S3 objects, one file per key named after its ETag.
+
+    A file is only ever read back for the exact ETag it was written for, and
+    writing a new version of a key deletes the older ones.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _prefix(self, key):
+        return os.path.join(self.cache_dir, key.replace('/', '__') + '@')
+
+    def path_for(self, key, etag):
+        return self._prefix(key) + etag.strip('"') + '.parquet'
+
+    def _files(self, key):
+        return glob.glob(glob.escape(self._prefix(key)) + '*.parquet')
+
+    def etag_for(self, key):
+        # ETag of the newest mirrored copy of ``key``, or None
+        files = self._files(key)
+        if not files:
+            return None
+        newest = max(files, key=os.path.getmtime)
+        return '"%s"' % newest[len(self._prefix(key)):-len('.parquet')]
+
+    def load(self, key, etag):
+        path = self.path_for(key, etag)
+        if not os.path.exists(path):
+            return None
+        try:
+            return pd.read_parquet(path)
+        except (OSError, pa.ArrowException) as e:
+            logger.warning("discarding unreadable mirror %s: %s", path, e)
+            os.remove(path)
+            return None
+
+    def save(self, key, etag, df):
+        path = self.path_for(key, etag)
+        tmp_path = '%s.%d.tmp' % (path, os.getpid())
+        try:
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        except (OSError, ValueError, TypeError, pa.ArrowException) as e:
+            # Mixed-type object columns cannot always be stored and the disk may be full or
+            # read-only; the mirror is only a shortcut, so keep serving from S3
+            logger.warning("could not mirror %s: %s", key, e)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+        self.evict(key, keep=path)
+        return True
+
+    def evict(self, key, keep=None):
+        # Remove every mirrored version of ``key`` except ``keep``
+        for path in self._files(key):
+            if path != keep:
+                os.remove(path)
+
+    def prune(self, keys):
+        # Remove mirrors superseded by a newer copy of the same key, those of keys not in
+        # ``keys`` and temporary files left by interrupted saves
+        keep = set()
+        for key in keys:
+            files = self._files(key)
+            if files:
+                keep.add(max(files, key=os.path.getmtime))
+        for path in glob.glob(os.path.join(glob.escape(self.cache_dir), '*.parquet')):
+            if path not in keep:
+                os.remove(path)
+        for path in glob.glob(os.path.join(glob.escape(self.cache_dir), '*.tmp')):
+            os.remove(path)
@@ -0,0 +1,83 @@
+# Distinct counts over day windows from per-day sets, built once per dataset version
+import numpy as np
+import pandas as pd
+
+
+class DistinctByDay:
+    """Number of distinct ``value_column`` values among the rows of any run of days.
+
+    ``day_column`` holds midnight timestamps (normalize.py's ``date`` for
+    revenue). Missing values are not counted, as in ``Series.nunique``.
+
+    With ``precision=None`` the counts are exact: each day keeps the codes of
+    its distinct values, and a window sets them in one bitmap and counts it.
+
+    With a ``precision`` p each day keeps a HyperLogLog sketch of 2**p one-byte
+    registers and a window merges them with an element-wise max, so a count
+    costs the same whatever the number of rows. The relative standard error
+    is 1.04 / sqrt(2**p): about 1.6% at p=12 and 0.8% at p=14, and results
+    within three times that cover 99% of cases. Small counts fall back to
+    linear counting and are nearly exact.
+    """
+
+    def __init__(self, df, day_column, value_column, precision=None):
+        rows = df[[day_column, value_column]].dropna()
+        self.precision = precision
+        day_codes, days = pd.factorize(rows[day_column], sort=True)
+        self.days = pd.DatetimeIndex(days)
+        if precision is None:
+            self._build_exact(day_codes, rows[value_column])
+        else:
+            self._build_sketches(day_codes, rows[value_column])
+
+    def _build_exact(self, day_codes, values):
+        codes, uniques = pd.factorize(values)
+        self.width = width = max(len(uniques), 1)
+        # One sorted key per distinct (day, value) pair
+        pairs = np.unique(day_codes.astype(np.int64) * width + codes)
+        pair_days = pairs // width
+        self.codes = pairs - pair_days * width
+        # codes[offsets[i]:offsets[i + 1]] are day i's distinct values
+        self.offsets = np.searchsorted(pair_days, np.arange(len(self.days) + 1))
+
+    def _build_sketches(self, day_codes, values):
+        p = self.precision
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        buckets = (hashes & np.uint64((1 << p) - 1)).astype(np.int64)
+        rest = hashes >> np.uint64(p)
+        # Rank: position of the lowest set bit of the remaining 64 - p bits
+        lowest = rest & (~rest + np.uint64(1))
+        ranks = np.full(len(rest), 64 - p + 1, dtype=np.uint8)
+        nonzero = rest != 0
+        ranks[nonzero] = np.log2(lowest[nonzero]).astype(np.uint8) + 1
+        self.registers = np.zeros(len(self.days) << p, dtype=np.uint8)
+        np.maximum.at(self.registers, day_codes.astype(np.int64) << p | buckets, ranks)
+        self.registers = self.registers.reshape(len(self.days), 1 << p)
+
+    def day_bounds(self, start=None, end=None):
+        # Positions of the days with start <= day < end
+        lo = 0 if start is None else self.days.searchsorted(pd.Timestamp(start), side='left')
+        hi = len(self.days) if end is None else self.days.searchsorted(pd.Timestamp(end), side='left')
+        return int(lo), int(max(lo, hi))
+
+    def count(self, start=None, end=None):
+        lo, hi = self.day_bounds(start, end)
+        if lo == hi:
+            return 0
+        if self.precision is None:
+            # Bitmap over all value codes, set by each day's distinct codes
+            seen = np.zeros(self.width, dtype=bool)
+            seen[self.codes[self.offsets[lo]:self.offsets[hi]]] = True
+            return int(np.count_nonzero(seen))
+        return estimate(self.registers[lo:hi].max(axis=0))
+
+
+def estimate(registers):
+    # HyperLogLog cardinality estimate from merged registers
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / np.ldexp(1.0, -registers.astype(np.int64)).sum()
+    zeros = int((registers == 0).sum())
+    if raw <= 2.5 * m and zeros:
+        return int(round(m * np.log(m / zeros)))
+    return int(round(raw))
@@ -0,0 +1,94 @@
+# Built Plotly figures, shared by every session of the server process and
+# reused across reruns while the data a chart is drawn from is unchanged
+import hashlib
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def fingerprint(*values):
+    """Hash of a chart's input data.
+
+    Frames and Series hash their values and index with
+    ``pd.util.hash_pandas_object`` plus their column names and dtypes; other
+    values (lists, numbers, strings) hash their ``repr``.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for value in values:
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            digest.update(repr((type(value).__name__, value.shape, getattr(value, 'name', None),
+                                list(getattr(value, 'columns', [])), [str(dtype) for dtype in np.atleast_1d(value.dtypes)],
+                                list(value.index.names))).encode())
+            digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        else:
+            digest.update(repr(value).encode())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class FigureCache:
+    """Bounded LRU of built figures keyed by chart name and input fingerprint.
+
+    The chart name stands for everything fixed in the code that builds the
+    chart (type, columns, titles, layout), so only the data is hashed. The
+    whole figure, including any ``update_layout``/``update_traces``, must be
+    built by ``build``: cached figures are shared and must not be modified
+    afterwards (``st.plotly_chart`` only reads them).
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._figures = OrderedDict()
+        # hits / misses, and evictions to stay within max_entries
+        self.counters = Counter()
+        # build_s: time spent building figures on misses
+        # lookup_s: time spent hashing inputs and finding the figure on hits
+        self.build_s = 0.0
+        self.lookup_s = 0.0
+
+    def get(self, name, data, build):
+        # ``data`` is the chart's input, or a tuple of them
+        started = time.perf_counter()
+        key = (name, fingerprint(*data) if isinstance(data, tuple) else fingerprint(data))
+        with self._lock:
+            figure = self._figures.get(key)
+            if figure is not None:
+                self._figures.move_to_end(key)
+                self.counters['hits'] += 1
+                self.lookup_s += time.perf_counter() - started
+                return figure
+        built = time.perf_counter()
+        figure = build()
+        elapsed = time.perf_counter() - built
+        with self._lock:
+            self.counters['misses'] += 1
+            self.build_s += elapsed
+            self._figures[key] = figure
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+                self.counters['evictions'] += 1
+        logger.info("built figure %s in %.3fs; %s", name, elapsed, self.stats())
+        return figure
+
+    def clear(self):
+        with self._lock:
+            self._figures.clear()
+
+    def stats(self):
+        with self._lock:
+            hits, misses = self.counters['hits'], self.counters['misses']
+            return {
+                'cache': dict(self.counters),
+                'entries': len(self._figures),
+                'build_s': round(self.build_s, 3),
+                'mean_build_ms': round(1000 * self.build_s / misses, 2) if misses else 0.0,
+                'lookup_s': round(self.lookup_s, 3),
+                'mean_lookup_ms': round(1000 * self.lookup_s / hits, 2) if hits else 0.0,
+            }
@@ -0,0 +1,35 @@
+# Subscriptions joined to their customers, materialized once per pair of
+# dataset versions instead of merged again on every rerun. The join keeps
+# the subscriptions' order (sorted on trial_end by normalize.py), so the
+# rows for a range of trial dates are one slice of it.
+import numpy as np
+import pandas as pd
+
+
+def build_id_index(customers_df):
+    # Hash index of the customer ids: pandas builds its hash table on the first lookup and keeps it
+    return pd.Index(customers_df['id'])
+
+
+def build_customer_subscriptions(subscriptions_df, customers_df, id_index):
+    """Same frame as ``subscriptions_df.merge(customers_df, left_on="customer_id", right_on="id", how="inner")``.
+
+    Each subscription's customer row is looked up in ``id_index`` (from
+    ``build_id_index(customers_df)``), so only the subscriptions' ids are
+    hashed. Columns in both frames get merge's '_x' and '_y' suffixes.
+    Customer ids that are not unique, or keys of different types, fall back
+    to the merge itself.
+    """
+    keys = subscriptions_df['customer_id']
+    if not id_index.is_unique or keys.dtype != id_index.dtype:
+        return subscriptions_df.merge(customers_df, left_on="customer_id", right_on="id", how="inner")
+    matches = id_index.get_indexer(keys)
+    left = np.flatnonzero(matches >= 0)
+    right = matches[left]
+    overlap = subscriptions_df.columns.intersection(customers_df.columns)
+    parts = []
+    for df, rows, suffix in ((subscriptions_df, left, '_x'), (customers_df, right, '_y')):
+        part = df.take(rows)
+        part.columns = [f'{column}{suffix}' if column in overlap else column for column in df.columns]
+        parts.append(part.reset_index(drop=True))
+    return pd.concat(parts, axis=1)
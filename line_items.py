@@ -0,0 +1,40 @@
+# Classification of revenue line items by their description
+import numpy as np
+import pandas as pd
+
+SUBSCRIPTION = 'subscription'
+PRODUCT = 'product'
+
+# (class, case-insensitive regex on the description) in priority order: a
+# description gets the first class that matches, and PRODUCT if none does.
+# The Revenue page splits subscriptions from everything else, so classes
+# added after SUBSCRIPTION only refine what counts as a product.
+LINE_ITEM_CLASSES = [
+    (SUBSCRIPTION, 'subscription'),
+    ('add_on', r'add[- ]?on'),
+    ('setup_fee', r'set[- ]?up fee'),
+    ('one_off', r'one[- ]?(?:off|time)'),
+]
+
+
+def classify_line_items(descriptions, classes=LINE_ITEM_CLASSES, default=PRODUCT):
+    """Categorical class of each description.
+
+    Each pattern is matched once per distinct description and the result is
+    broadcast to the rows through the factorized codes. Missing descriptions
+    get ``default``.
+    """
+    codes, uniques = pd.factorize(descriptions)
+    uniques = pd.Series(uniques, dtype=object).astype(str)
+    names = [name for name, _ in classes] + [default]
+    # Position in ``names`` for every distinct description, plus one slot for missing
+    unique_classes = np.full(len(uniques) + 1, len(classes), dtype=np.int8)
+    unclassified = np.ones(len(uniques), dtype=bool)
+    for position, (_, pattern) in enumerate(classes):
+        matched = unclassified & uniques.str.contains(pattern, case=False, regex=True).to_numpy()
+        unique_classes[:-1][matched] = position
+        unclassified &= ~matched
+    # codes is -1 for missing descriptions, which picks the trailing default slot
+    row_classes = unique_classes[codes]
+    return pd.Series(pd.Categorical.from_codes(row_classes, categories=names),
+                     index=descriptions.index, name='line_item_class')
@@ -0,0 +1,130 @@
+# KPIs, chart data and the intermediates they share, declared as a graph of
+# named metrics. A metric is a function whose argument names are its
+# dependencies: other metrics, datasets ('revenue', 'customers', ...) or page
+# parameters ('start_date', ...). The executor computes each metric at most
+# once per run, memoizes it under the versions and parameters it actually
+# depends on, and so lets a page reuse what another page already computed.
+import inspect
+import threading
+
+from task_graph import TaskGraph
+
+# How long a metric's value is kept:
+#   'version': per version of the datasets it reads, in the dataset store (whole-dataset aggregates, joins, indexes)
+#   'page': in the page cache, per dataset versions and parameter values
+#   None: for the current run only (slices and lookups cheaper than caching them)
+CACHE_KINDS = ('version', 'page', None)
+
+
+class Metric:
+    def __init__(self, name, fn, cache):
+        if cache not in CACHE_KINDS:
+            raise ValueError(f"metric {name!r}: cache must be one of {CACHE_KINDS}")
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(inspect.signature(fn).parameters)
+        self.cache = cache
+
+
+class MetricSet:
+    """Registry of metrics, filled with the ``metric`` decorator::
+
+        @metrics.metric(cache=None)
+        def filtered_revenue(revenue, start_date, end_date): ...
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self._inputs = {}
+
+    def metric(self, cache='page'):
+        def register(fn):
+            if fn.__name__ in self.metrics:
+                raise ValueError(f"metric {fn.__name__!r} defined twice")
+            self.metrics[fn.__name__] = Metric(fn.__name__, fn, cache)
+            return fn
+        return register
+
+    def inputs(self, name):
+        # Datasets and parameters metric ``name`` depends on, directly or through other metrics
+        if name not in self._inputs:
+            if name not in self.metrics:
+                self._inputs[name] = frozenset([name])
+            else:
+                self._inputs[name] = frozenset().union(*(self.inputs(dep) for dep in self.metrics[name].deps))
+        return self._inputs[name]
+
+
+class _Once:
+    # A value computed by the first thread asking for it; the others wait for it
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.done = False
+        self.value = None
+
+    def get(self, compute):
+        with self.lock:
+            if not self.done:
+                self.value = compute()
+                self.done = True
+            return self.value
+
+
+class MetricExecutor:
+    """Evaluates the metrics of ``metrics`` (a MetricSet) for one run of a page.
+
+    ``inputs`` maps dataset and parameter names to this run's values and
+    ``versions`` the datasets to their versions. Without ``cache`` (a
+    PageCache) or ``store`` (the DatasetStore) metrics of those kinds are
+    only kept for the run.
+    """
+
+    def __init__(self, metrics, inputs, versions=None, cache=None, store=None):
+        self.metrics = metrics
+        self.inputs = inputs
+        self.versions = versions or {}
+        self.cache = cache
+        self.store = store
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def value(self, name):
+        if name in self.inputs:
+            return self.inputs[name]
+        if name not in self.metrics.metrics:
+            raise KeyError(f"no metric or input named {name!r}")
+        with self._lock:
+            once = self._values.setdefault(name, _Once())
+        return once.get(lambda: self._compute(self.metrics.metrics[name]))
+
+    def _compute(self, metric):
+        compute = lambda: metric.fn(*(self.value(dep) for dep in metric.deps))
+        inputs = self.metrics.inputs(metric.name)
+        if metric.cache == 'version' and self.store is not None:
+            datasets = sorted(name for name in inputs if name in self.versions)
+            if len(datasets) != len(inputs):
+                raise ValueError(f"metric {metric.name!r} is kept per version but depends on {sorted(inputs)}")
+            # Dependencies first, so sessions waiting on this build wait only for the metric itself.
+            # Built from the frames the store passes in, kept only if they are the versions it serves
+            args = {dep: self.value(dep) for dep in metric.deps}
+            build = lambda *frames: metric.fn(**{**args, **{name: df for name, df in zip(datasets, frames) if name in args}})
+            if len(datasets) == 1:
+                return self.store.derived(datasets[0], metric.name, build, self.inputs[datasets[0]], self.versions[datasets[0]])
+            return self.store.derived_from(datasets, metric.name, build, {name: self.inputs[name] for name in datasets},
+                                           self.versions)
+        if metric.cache == 'page' and self.cache is not None and self.versions:
+            versions = tuple(sorted((name, self.versions[name]) for name in inputs if name in self.versions))
+            params = tuple(sorted((name, self.inputs[name]) for name in inputs if name not in self.versions))
+            return self.cache.get((metric.name, versions, params), compute)
+        return compute()
+
+    def values(self, names):
+        # Computed in turn on the calling thread
+        return {name: self.value(name) for name in names}
+
+    def graph(self, names):
+        # A TaskGraph computing ``names`` at the same time; metrics they share are computed once
+        graph = TaskGraph()
+        for name in names:
+            graph.add(name, lambda name=name: self.value(name))
+        return graph
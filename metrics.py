@@ -0,0 +1,449 @@
+# The metrics the Summary, Revenue, Customers and Subscriptions pages show,
+# over the intermediates they share (see metric_graph.py). Arguments name
+# the dependencies: the datasets 'revenue', 'customers' and 'subscriptions',
+# the page parameters 'start_date', 'end_date' and 'today' (the calendar day),
+# or other metrics.
+# Customers and Subscriptions both read the subscriptions joined to their
+# customers, a slice of a join built once per pair of data versions.
+import datetime
+
+import pandas as pd
+
+from joins import build_customer_subscriptions, build_id_index
+from metric_graph import MetricSet
+from rollups import (build_customer_days, build_revenue_rollup, build_revenue_totals, build_subscription_days,
+                     by_month_name, monthly_revenue, monthly_slice, rollup_range)
+from table_pages import SortIndex
+from time_buckets import day_labels, month_labels
+from time_index import time_bounds, time_slice
+
+METRICS = MetricSet()
+metric = METRICS.metric
+
+
+# Summary: new users and subscriptions counted back from the newest revenue day
+
+@metric(cache='version')
+def customer_days(revenue):
+    # Distinct ids per day, built once per data version; a window merges its days' sets
+    return build_customer_days(revenue)
+
+
+@metric(cache='version')
+def subscription_days(revenue):
+    return build_subscription_days(revenue)
+
+
+@metric(cache='version')
+def latest_day(revenue):
+    # New users     - current day and last 7 days ('date' is the normalized creation day)
+    return revenue['date'].max()
+
+
+def _window_count(days, day, window):
+    # Distinct ids created on ``day``, or over the ``window`` days before it
+    if window == 0:
+        return days.count(day, day + datetime.timedelta(days=1))
+    return days.count(day - datetime.timedelta(days=window), day)
+
+
+@metric(cache=None)
+def new_users_today(customer_days, latest_day):
+    return _window_count(customer_days, latest_day, 0)
+
+
+@metric(cache=None)
+def new_users_last7days(customer_days, latest_day):
+    return _window_count(customer_days, latest_day, 7)
+
+
+@metric(cache=None)
+def new_users_last30days(customer_days, latest_day):
+    return _window_count(customer_days, latest_day, 30)
+
+
+# New subscriptions - current day and last 7 days
+@metric(cache=None)
+def new_sub_today(subscription_days, latest_day):
+    return _window_count(subscription_days, latest_day, 0)
+
+
+@metric(cache=None)
+def new_sub_last7days(subscription_days, latest_day):
+    return _window_count(subscription_days, latest_day, 7)
+
+
+@metric(cache=None)
+def new_sub_last30days(subscription_days, latest_day):
+    return _window_count(subscription_days, latest_day, 30)
+
+
+@metric(cache='version')
+def monthly_new_users(revenue):
+    # Group by month and count new users and new subscriptions
+    monthly_new_users = revenue.groupby('month_code', dropna=False).size().reset_index(name='new_users')
+    monthly_new_users['month'] = month_labels(monthly_new_users['month_code'])
+    return monthly_new_users
+
+
+@metric(cache='version')
+def monthly_new_subscriptions(subscriptions):
+    # Group the data by creation month and count the number of new subscriptions for each month
+    monthly_new_subscriptions = subscriptions.groupby('created_month_code', dropna=False).size().reset_index(name='new_subscriptions')
+    monthly_new_subscriptions['month'] = month_labels(monthly_new_subscriptions['created_month_code'])
+    return monthly_new_subscriptions
+
+
+@metric(cache='version')
+def monthly_cancellations(subscriptions):
+    # Group by cancellation month and count cancellations
+    monthly_cancellations = subscriptions.groupby('canceled_month_code', dropna=False).size().reset_index(name='cancellations')
+    monthly_cancellations['month'] = month_labels(monthly_cancellations['canceled_month_code'])
+    # Filter for y-axis data under 1500
+    return monthly_cancellations[monthly_cancellations['cancellations'] < 1500]
+
+
+# Revenue: cards from running totals, charts from the daily rollup
+
+@metric(cache='version')
+def daily_rollup(revenue):
+    # Daily sums per subscription/product, description, currency and plan, built once per
+    # data version; the charts read from it instead of the raw rows
+    return build_revenue_rollup(revenue)
+
+
+@metric(cache='version')
+def totals(revenue):
+    return build_revenue_totals(revenue)
+
+
+@metric(cache=None)
+def revenue_bounds(revenue, start_date, end_date):
+    # The selected range as rows lo:hi of the time-sorted frame
+    return time_bounds(revenue, 'created', start_date, end_date)
+
+
+@metric(cache=None)
+def filtered_revenue(revenue, revenue_bounds):
+    lo, hi = revenue_bounds
+    return revenue.iloc[lo:hi]
+
+
+@metric(cache=None)
+def range_totals(totals, start_date, end_date):
+    # Headline totals from running sums over the whole dataset: two lookups per date change
+    return totals.totals(start_date, end_date)
+
+
+# 1. Total Transaction Amount (sum of all invoice amounts)
+@metric(cache=None)
+def total_transaction_amount(range_totals):
+    return range_totals['total_invoice_amount']
+
+
+# 2. Total Subscription Amount (assuming 'subscription' keyword in description)
+@metric(cache=None)
+def total_subscription_amount(range_totals):
+    return range_totals['subscription_amount']
+
+
+# 3. Total Products Amount (rows where 'description' does NOT contain 'subscription')
+@metric(cache=None)
+def total_product_amount(range_totals):
+    return range_totals['product_amount']
+
+
+# 4. Tax Amount (assuming 'tax_info_type' provides relevant details)
+@metric(cache=None)
+def tax_amount(range_totals):
+    return range_totals['tax']  # Adjust this to the actual tax column
+
+
+@metric()
+def monthly(daily_rollup, start_date, end_date):
+    # Every monthly figure, for the selected range and for all dates, from one groupby of the rollup
+    return monthly_revenue(daily_rollup, start_date, end_date)
+
+
+@metric(cache=None)
+def range_monthly(monthly):
+    return monthly_slice(monthly, 'range')
+
+
+@metric(cache=None)
+def product_rollup(daily_rollup, start_date, end_date):
+    filtered_rollup = rollup_range(daily_rollup, start_date, end_date)
+    return filtered_rollup[~filtered_rollup['is_subscription']]
+
+
+# Graphs 1, 2 and 5: net amount, tax, and tax and fee per 'YYYY-MM' month of the range
+@metric()
+def monthly_net_amount(range_monthly):
+    return range_monthly[['month', 'net_amount']].rename(columns={'month': 'year_month'})
+
+
+@metric()
+def monthly_tax(range_monthly):
+    return range_monthly[['month', 'tax']].rename(columns={'month': 'year_month'})
+
+
+@metric()
+def tax_fee(range_monthly):
+    return range_monthly[['month', 'tax', 'fee']]
+
+
+# Graph 3: top customers on whole-dollar invoice amounts
+@metric()
+def top_customers(filtered_revenue):
+    invoice_amount = filtered_revenue['total_invoice_amount'].astype(int)# Convert the 'total_invoice_amount' column to integer type
+    top_customers = invoice_amount.groupby(filtered_revenue['email']).sum().reset_index()# Group the data by 'customer_id' and sum the 'total_invoice_amount' for each customer
+    return top_customers.sort_values(by='total_invoice_amount', ascending=False).head(5)# Sort the data by 'total_invoice_amount' in descending order and select the top 10 customers
+
+
+# Graph 4
+@metric()
+def top_revenue_by_product(product_rollup):
+    revenue_by_product = product_rollup.groupby('description')['total_invoice_amount'].sum().reset_index() # Group the data by 'description' and sum the 'total_invoice_amount' for each product
+    return revenue_by_product.sort_values(by='total_invoice_amount', ascending=False).head(5) # Sort the values and get the top 10
+
+
+# Graph 6
+@metric()
+def subscription_analysis(filtered_revenue):
+    subscription_analysis = filtered_revenue['subscription'].value_counts().reset_index() # Create a dataframe with the count of each subscription type
+    subscription_analysis.columns = ['Subscription', 'Count'] # Rename the columns of the dataframe
+    return subscription_analysis
+
+
+# The trend charts cover every dated row, one bar per month in calendar order (January 2024, February 2024, etc.)
+def _trend(monthly, segment, measure):
+    trend = by_month_name(monthly_slice(monthly, 'all', segment), measure)
+    # Calculate the percentage change
+    trend['percent_change'] = trend[measure].pct_change() * 100
+    return trend
+
+
+@metric()
+def monthly_transaction(monthly):
+    return _trend(monthly, 'all', 'total_invoice_amount')
+
+
+@metric()
+def monthly_subscription(monthly):
+    return _trend(monthly, 'subscription', 'total_invoice_amount')
+
+
+@metric()
+def monthly_product(monthly):
+    return _trend(monthly, 'product', 'total_invoice_amount')
+
+
+@metric()
+def monthly_tax_trend(monthly):
+    return _trend(monthly, 'all', 'tax')
+
+
+# Customers and Subscriptions: subscriptions whose trial ends in the range, joined to their customers
+
+@metric(cache=None)
+def filtered_subscriptions(subscriptions, start_date, end_date):
+    # Filter the subscription data
+    return time_slice(subscriptions, "trial_end", start_date, end_date)
+
+
+@metric(cache='version')
+def customer_id_index(customers):
+    return build_id_index(customers)
+
+
+@metric(cache='version')
+def customer_subscriptions_table(subscriptions, customers, customer_id_index):
+    # Every subscription joined to its customer, in trial_end order, built once per pair of versions
+    return build_customer_subscriptions(subscriptions, customers, customer_id_index)
+
+
+@metric(cache=None)
+def customer_subscriptions_bounds(customer_subscriptions_table, start_date, end_date):
+    return time_bounds(customer_subscriptions_table, 'trial_end', start_date, end_date)
+
+
+@metric(cache=None)
+def customer_subscriptions(customer_subscriptions_table, customer_subscriptions_bounds):
+    # The subscriptions filtered on their trial dates, joined to their customers: rows lo:hi of the joined table
+    lo, hi = customer_subscriptions_bounds
+    return customer_subscriptions_table.iloc[lo:hi]
+
+
+@metric(cache=None)
+def filtered_customers(customers, start_date, end_date):
+    # Filter data
+    return time_slice(customers, 'created', start_date, end_date)
+
+
+def _status_count(subscriptions, status):
+    # Rows with ``status``, counted on the mask rather than on a filtered copy
+    return int((subscriptions["status"] == status).sum())
+
+
+# Calculate the total number of active, inactive and trialing customers
+@metric()
+def active_customers(customer_subscriptions):
+    return _status_count(customer_subscriptions, "active") # Calculate the total number of active customers
+
+
+@metric()
+def inactive_customers(customer_subscriptions):
+    return int((customer_subscriptions["status"] != "active").sum()) # Calculate the total number of inactive customers
+
+
+@metric()
+def trialing_customers(customer_subscriptions):
+    return _status_count(customer_subscriptions, "trialing") # Calculate the total number of trialing customers
+
+
+#Graph 1
+@metric()
+def monthly_new_customers(filtered_customers, today):
+    # Sign-ups over the 6 months up to the start of today
+    start_date = today - pd.DateOffset(months=6)
+    filtered_customers = time_slice(filtered_customers, 'created', start_date).set_index('created') # Group by month and count new customers
+    monthly_new_customers = filtered_customers.resample('M').size().reset_index(name='new_customers_count')
+    monthly_new_customers['year_month'] = monthly_new_customers['created'].dt.strftime('%Y-%m') # Correctly align data with the months
+    return monthly_new_customers.sort_values(by='created', ascending=True) # Sort by 'year_month' in ascending order
+
+
+#Graph 2
+@metric()
+def df_sign_up_data(filtered_customers):
+    # Sign-ups per month, newest first
+    df_sign_up = filtered_customers[["id", "month_code"]].rename(columns={"month_code": "Month_year"})
+    df_sign_up["Cust_count_month"] = df_sign_up.groupby("Month_year")["id"].transform('count')
+    df_sign_up_data = df_sign_up[["Month_year", "Cust_count_month"]]
+    df_sign_up_data = df_sign_up_data.drop_duplicates()
+    df_sign_up_data = df_sign_up_data.sort_values(by=['Month_year'], ascending=False)
+    df_sign_up_data.reset_index(drop=True, inplace=True)
+    df_sign_up_data["Month_year"] = month_labels(df_sign_up_data["Month_year"])
+    return df_sign_up_data
+
+
+@metric()
+def top_cities(filtered_customers):
+    # Cities of customers with a full shipping location
+    geo_data = filtered_customers[['shipping_address_city', 'shipping_address_country']].dropna()
+    top_cities = geo_data['shipping_address_city'].value_counts().reset_index()
+    top_cities.columns = ['City', 'Count']
+    return top_cities.head(10)
+
+
+#Graph 3
+@metric()
+def city_counts(filtered_customers):
+    city_counts = filtered_customers['shipping_address_city'].value_counts().reset_index()
+    city_counts.columns = ['City', 'Count']
+    return city_counts
+
+
+# Prepare data for the donut chart
+@metric()
+def country_counts(filtered_customers):
+    country_counts = filtered_customers['shipping_address_country'].value_counts().reset_index()
+    country_counts.columns = ['Country', 'Count']
+    return country_counts
+
+
+# Calculate the total number of active, inactive, trialing, past due, paused, and incomplete expired subscriptions
+@metric()
+def active_subscriptions(filtered_subscriptions):
+    return _status_count(filtered_subscriptions, "active")
+
+
+@metric()
+def inactive_subscriptions(filtered_subscriptions):
+    return int((filtered_subscriptions["status"] != "active").sum())
+
+
+@metric()
+def trialing_subscriptions(filtered_subscriptions):
+    return _status_count(filtered_subscriptions, "trialing")
+
+
+@metric()
+def past_due_subscriptions(filtered_subscriptions):
+    return _status_count(filtered_subscriptions, "past_due")
+
+
+@metric()
+def paused_subscriptions(filtered_subscriptions):
+    return _status_count(filtered_subscriptions, "paused")
+
+
+@metric(cache='version')
+def incomplete_expired_subscriptions(subscriptions):
+    # Over every subscription, not only the range
+    return _status_count(subscriptions, "incomplete_expired")
+
+
+# Graph 2
+# Monthly Active Subscriptions
+@metric()
+def monthly_active_subs(filtered_subscriptions):
+    monthly_active_subs = filtered_subscriptions.groupby("created_month_code", dropna=False)["customer_id"].count().reset_index()
+    monthly_active_subs["month"] = month_labels(monthly_active_subs["created_month_code"])
+    return monthly_active_subs
+
+
+@metric(cache=None)
+def active_filtered_subscriptions(filtered_subscriptions):
+    # Filter the dataframe to only include rows where the subscription status is active
+    return filtered_subscriptions[filtered_subscriptions["status"] == "active"]
+
+
+# Graph 3
+# Daily Active Subscriptions
+@metric()
+def daily_active_subs(active_filtered_subscriptions):
+    daily_active_subs = active_filtered_subscriptions.groupby("created_day_code")["customer_id"].count().reset_index() # Group the dataframe by the date of subscription creation and count the number of unique customer IDs for each date
+    daily_active_subs["day"] = day_labels(daily_active_subs["created_day_code"])
+    return daily_active_subs
+
+
+@metric()
+def customer_trials(active_filtered_subscriptions):
+    # Filter the data for the specific customer_id
+    subs = active_filtered_subscriptions
+    customer_trials = subs[subs["customer_id"]=="cus_OzTLZG52Io2Izb"][["customer_id","trial_start","trial_end","status"]].sort_values(by=["trial_start"])
+    return customer_trials.assign(trial_start=customer_trials["trial_start"].dt.date, trial_end=customer_trials["trial_end"].dt.date)
+
+
+@metric(cache='version')
+def customer_subscriptions_index(customer_subscriptions_table):
+    # Column orders of the whole joined table for sorting the VIEW DATA table, built on first use
+    return SortIndex(customer_subscriptions_table)
+
+
+# Graph 4
+@metric()
+def df_multiple_trials(customer_subscriptions):
+    # Count the number of times each customer has used the trial
+    df_trial_counts = customer_subscriptions["email"].value_counts().reset_index()
+    df_trial_counts.columns = ['email', 'trial_count']
+    return df_trial_counts[df_trial_counts['trial_count'] > 1] # Filter customers who have used the trial multiple times (e.g., more than once)
+
+
+# Graph 5
+@metric(cache='version')
+def status_trend(subscriptions):
+    # Group by start month and status
+    status_trend = subscriptions.groupby(['start_month_code', 'status']).size().reset_index(name='count')
+    # Month labels for plotting
+    status_trend['month_year'] = month_labels(status_trend['start_month_code'])
+    return status_trend
+
+
+@metric(cache='version')
+def subscription_trend(revenue):
+    # Group by month and subscription status
+    subscription_trend = revenue.groupby(['month_code', 'subscription']).size().reset_index(name='count')
+    # Month labels for plotting
+    subscription_trend['month_year'] = month_labels(subscription_trend['month_code'], '%b %Y')
+    return subscription_trend
@@ -0,0 +1,49 @@
+# One-time normalization of freshly loaded datasets. Every derived column the
+# pages need is materialized here once per dataset version, so page methods
+# only read and never convert or add columns on the shared frames. Every
+# dataset is also sorted on its primary time column so date ranges can be
+# sliced with time_index.time_slice. Day and month buckets are stored as
+# integer codes (time_buckets.py) and labelled only after grouping.
+from line_items import classify_line_items
+from schemas import SCHEMAS
+from time_buckets import day_codes, month_codes
+
+
+def normalize_revenue(df):
+    df['date'] = df['created'].dt.normalize()
+    df['month_code'] = month_codes(df['created'])
+    df['line_item_class'] = classify_line_items(df['description'])
+    return df
+
+
+def normalize_customers(df):
+    df['month_code'] = month_codes(df['created'])
+    return df
+
+
+def normalize_subscriptions(df):
+    df['created_month_code'] = month_codes(df['created'])
+    df['canceled_month_code'] = month_codes(df['canceled_at'])
+    df['created_day_code'] = day_codes(df['created'])
+    df['start_month_code'] = month_codes(df['start'])
+    return df
+
+
+NORMALIZERS = {
+    'revenue': normalize_revenue,
+    'customers': normalize_customers,
+    'subscriptions': normalize_subscriptions,
+}
+
+
+def normalize(name, df):
+    # Returns a new frame; the loaded (and mirrored) frame is left untouched
+    time_column = SCHEMAS[name]['time_column']
+    if time_column in df.columns:
+        df = df.sort_values(time_column, kind='stable', na_position='last', ignore_index=True)
+    else:
+        df = df.copy(deep=False)
+    normalizer = NORMALIZERS.get(name)
+    if normalizer is None:
+        return df
+    return normalizer(df)
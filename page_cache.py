@@ -0,0 +1,218 @@
+# Results of the pages' compute steps, shared by every session of the server process
+import logging
+import os
+import pickle
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Memory budget for cached results, overridable per deployment
+DEFAULT_MAX_BYTES = int(os.environ.get('DASHBOARD_PAGE_CACHE_MB', '512')) * 2 ** 20
+
+
+def deep_size(value):
+    """Bytes held by a cached value, counting DataFrame contents deeply.
+
+    Frames and Series use ``memory_usage(deep=True)``, so object columns
+    count their strings; containers add up their items.
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(deep_size(key) + deep_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(deep_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class PageCache:
+    """Bounded cache of page computations, sized by memory.
+
+    Keys are ``(page, dataset versions, filters)``, so a new dataset version
+    or a different filter is a miss, while sessions looking at the same data
+    with the same filters share one result. A session asking for a key that
+    another one is computing waits for that result instead of computing it
+    again. Values are shared between sessions and must not be modified.
+
+    Each entry's size is measured with ``deep_size``. When the entries exceed
+    ``max_bytes`` (or ``max_entries``), the least frequently used of the
+    ``lfu_window`` least recently used entries is evicted, so a result
+    many sessions come back to outlives one-off date ranges. A value larger
+    than ``max_bytes`` on its own is returned but not cached.
+
+    With ``compress=True`` (needs ``zstandard``) entries that drop out of the
+    ``hot_entries`` most recently used are pickled and zstd-compressed, and
+    decompressed again on their next hit.
+    """
+
+    def __init__(self, max_entries=64, max_bytes=DEFAULT_MAX_BYTES, lfu_window=8, compress=False,
+                 hot_entries=8, compression_level=3):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.lfu_window = lfu_window
+        self.hot_entries = hot_entries
+        self._zstd = None
+        if compress:
+            import zstandard
+            self._zstd = zstandard
+            self.compression_level = compression_level
+        # Guards the entries, pending computations and counters
+        self._lock = threading.Lock()
+        # key -> {'value', 'bytes', 'raw_bytes', 'compressed', 'uses'}, least recently used first
+        self._entries = OrderedDict()
+        # key -> Event set once the computation of key finished or failed
+        self._pending = {}
+        self.bytes = 0
+        # hits: served from the cache, including after waiting on another session
+        # misses: computed
+        # waits: found the key being computed by another session
+        # evictions / evicted_bytes: dropped to stay within the limits
+        # too_large: computed but bigger than the whole budget, not cached
+        # compressions / decompressions: cold entries packed and unpacked again on a hit
+        self.counters = Counter()
+        self.page_counters = defaultdict(Counter)
+        self.compute_s = 0.0
+
+    def get(self, key, compute):
+        page = key[0]
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    entry['uses'] += 1
+                    self.counters['hits'] += 1
+                    self.page_counters[page]['hits'] += 1
+                    if not entry['compressed']:
+                        return entry['value']
+                    # Taken under the lock: another session may unpack the entry meanwhile
+                    packed = entry['value']
+                    break
+                pending = self._pending.get(key)
+                if pending is None:
+                    pending = self._pending[key] = threading.Event()
+                    break
+                self.counters['waits'] += 1
+            # Served from the cache on the next pass, or computed here if that session failed
+            pending.wait()
+
+        if entry is not None:
+            return self._decompress(key, entry, packed)
+
+        try:
+            started = time.perf_counter()
+            value = compute()
+            elapsed = time.perf_counter() - started
+            size = deep_size(value)
+        except BaseException:
+            with self._lock:
+                del self._pending[key]
+            pending.set()
+            raise
+
+        with self._lock:
+            self.counters['misses'] += 1
+            self.page_counters[page]['misses'] += 1
+            self.compute_s += elapsed
+            del self._pending[key]
+            if size > self.max_bytes:
+                self.counters['too_large'] += 1
+            else:
+                self._entries[key] = {'value': value, 'bytes': size, 'raw_bytes': size, 'compressed': False, 'uses': 1}
+                self.bytes += size
+                self._evict()
+            cold = self._cold_keys()
+        pending.set()
+        logger.info("computed %s in %.3fs (%d bytes); %s", page, elapsed, size, self.stats())
+        for cold_key in cold:
+            self._compress(cold_key)
+        return value
+
+    def _evict(self):
+        # Least frequently used among the least recently used entries, oldest first on ties
+        while self._entries and (self.bytes > self.max_bytes or len(self._entries) > self.max_entries):
+            window = []
+            for key in self._entries:
+                window.append(key)
+                if len(window) == self.lfu_window:
+                    break
+            victim = min(window, key=lambda key: self._entries[key]['uses'])
+            entry = self._entries.pop(victim)
+            self.bytes -= entry['bytes']
+            self.counters['evictions'] += 1
+            self.counters['evicted_bytes'] += entry['bytes']
+
+    def _cold_keys(self):
+        # Uncompressed entries outside the most recently used ``hot_entries``
+        if self._zstd is None:
+            return []
+        keys = list(self._entries)[:max(len(self._entries) - self.hot_entries, 0)]
+        return [key for key in keys if not self._entries[key]['compressed']]
+
+    def _compress(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry['compressed']:
+                return
+            value = entry['value']
+        # Compressed outside the lock; swapped in only if the entry was not replaced meanwhile
+        packed = self._zstd.ZstdCompressor(level=self.compression_level).compress(
+            pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        with self._lock:
+            if self._entries.get(key) is not entry or entry['compressed']:
+                return
+            self.bytes += len(packed) - entry['bytes']
+            entry.update(value=packed, bytes=len(packed), compressed=True)
+            self.counters['compressions'] += 1
+
+    def _decompress(self, key, entry, packed):
+        value = pickle.loads(self._zstd.ZstdDecompressor().decompress(packed))
+        with self._lock:
+            # Hot again: keep it unpacked, unless another session already did
+            if self._entries.get(key) is entry and entry['compressed']:
+                self.bytes += entry['raw_bytes'] - entry['bytes']
+                entry.update(value=value, bytes=entry['raw_bytes'], compressed=False)
+                self.counters['decompressions'] += 1
+                self._evict()
+            elif self._entries.get(key) is entry:
+                value = entry['value']
+            cold = self._cold_keys()
+        for cold_key in cold:
+            self._compress(cold_key)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            compressed = [entry for entry in self._entries.values() if entry['compressed']]
+            return {
+                'cache': dict(self.counters),
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'compressed_entries': len(compressed),
+                'compressed_bytes': sum(entry['bytes'] for entry in compressed),
+                'uncompressed_bytes': sum(entry['raw_bytes'] for entry in compressed),
+                'hit_rate': _hit_rate(self.counters),
+                'pages': {page: {**counts, 'hit_rate': _hit_rate(counts)} for page, counts in self.page_counters.items()},
+                'compute_s': round(self.compute_s, 3),
+            }
+
+
+def _hit_rate(counts):
+    lookups = counts['hits'] + counts['misses']
+    return round(counts['hits'] / lookups, 3) if lookups else 0.0
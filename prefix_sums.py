@@ -0,0 +1,45 @@
+# Cumulative sums over time-sorted frames, for date-range totals in constant time
+import numpy as np
+import pandas as pd
+
+from time_index import series_bounds
+
+
+class PrefixSums:
+    """Running totals of some measures along a frame's time column.
+
+    ``df`` must be sorted on ``column`` with missing dates last (normalize.py
+    sorts every dataset that way). ``measures`` is a list of column names or
+    a dict of name -> values aligned with ``df``. Missing values count as 0,
+    as in ``Series.sum``.
+
+    The total of a measure over any date range is two binary searches on the
+    time column and one subtraction, whatever the size of the range.
+    """
+
+    def __init__(self, df, column, measures):
+        if not isinstance(measures, dict):
+            measures = {name: df[name] for name in measures}
+        self.times = pd.Series(df[column].to_numpy())
+        self.sums = {}
+        for name, values in measures.items():
+            values = pd.Series(values).to_numpy(dtype='float64', na_value=0.0)
+            # sums[name][i] is the total of the first i rows
+            self.sums[name] = np.concatenate(([0.0], np.cumsum(values)))
+
+    def __len__(self):
+        return len(self.times)
+
+    def bounds(self, start=None, end=None, inclusive='both'):
+        # Row positions of the range, as time_index.time_bounds
+        return series_bounds(self.times, start, end, inclusive)
+
+    def total(self, measure, start=None, end=None, inclusive='both'):
+        lo, hi = self.bounds(start, end, inclusive)
+        sums = self.sums[measure]
+        return sums[hi] - sums[lo]
+
+    def totals(self, start=None, end=None, inclusive='both'):
+        # Every measure over one range, sharing the lookups
+        lo, hi = self.bounds(start, end, inclusive)
+        return {name: sums[hi] - sums[lo] for name, sums in self.sums.items()}
@@ -0,0 +1,22 @@
+# Pages drawn in stages: the cheap KPI cards first, then every chart block in
+# the slot reserved for it as soon as its data and figure are ready, instead
+# of one paint after the whole page has been computed. Streamlit sends each
+# element to the browser as the script emits it, so the cards are visible
+# while the charts are still being computed.
+
+
+def render_blocks(graph, blocks, workers=1):
+    """Run ``graph`` (a TaskGraph) and draw ``blocks``, a list of ``(slot, name, draw)``.
+
+    ``slot`` is an ``st.empty()`` placed where the block belongs on the page
+    and ``draw(value)`` renders the value of task ``name`` into it, on the
+    script thread, as soon as that task is done. The tasks run on
+    ``workers`` background threads (see ``TaskGraph.run``), or in turn on the
+    script thread with 0 workers.
+    """
+    slots = {name: (slot, draw) for slot, name, draw in blocks}
+    for name, value in graph.run(workers):
+        if name in slots:
+            slot, draw = slots[name]
+            with slot.container():
+                draw(value)
@@ -0,0 +1,89 @@
+# Which sections of the dashboard ran in each rerun, and what each one cost.
+# A full run executes every section of the page; a widget inside a fragment
+# reruns only that fragment, which shows up here as a run of its own.
+# Milestones are points a user notices, like the first metric on screen,
+# timed from the start of the run.
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class RerunTrace:
+    """Per-session record of the last ``max_runs`` runs and their sections.
+
+    The script calls ``start('full')`` first, ``mark(name)`` where each
+    section begins (ending the previous one), ``milestone(name)`` when
+    something the user waits for is on screen, and ``end()`` last. A fragment
+    wraps its body in ``fragment(name)``: inside a full run that is one more
+    section, and when Streamlit reruns the fragment alone it records a run of
+    kind 'fragment' with just that section.
+    """
+
+    def __init__(self, max_runs=20):
+        self.runs = deque(maxlen=max_runs)
+        self.count = 0
+        self._run = None
+        self._section = None
+
+    def start(self, kind):
+        self.count += 1
+        self._run = {'run': self.count, 'kind': kind, 'sections': [], 'milestones': [], 'started': time.perf_counter()}
+        self._section = None
+
+    def mark(self, name):
+        if self._run is None:
+            return
+        now = time.perf_counter()
+        self._close_section(now)
+        self._section = (name, now)
+
+    def milestone(self, name):
+        if self._run is None:
+            return
+        self._run['milestones'].append((name, time.perf_counter() - self._run['started']))
+
+    def end(self):
+        if self._run is None:
+            return
+        now = time.perf_counter()
+        self._close_section(now)
+        run, self._run = self._run, None
+        run['total_s'] = now - run.pop('started')
+        self.runs.append(run)
+        logger.info("%s run %d in %.3fs: %s", run['kind'], run['run'], run['total_s'],
+                    ', '.join(f"{name} {elapsed:.3f}s" for name, elapsed in run['sections']))
+        if run['milestones']:
+            logger.info("%s run %d: %s", run['kind'], run['run'],
+                        ', '.join(f"{name} at {at:.3f}s" for name, at in run['milestones']))
+
+    @contextmanager
+    def fragment(self, name):
+        # Its own run when nothing else is running, i.e. when Streamlit reran just this fragment
+        alone = self._run is None
+        if alone:
+            self.start('fragment')
+        self.mark(name)
+        try:
+            yield
+        finally:
+            if alone:
+                self.end()
+
+    def _close_section(self, now):
+        if self._section is not None:
+            name, started = self._section
+            self._run['sections'].append((name, now - started))
+            self._section = None
+
+    def rows(self):
+        # One row per section of every recorded run, most recent run first
+        return [{'run': run['run'], 'kind': run['kind'], 'section': name, 'seconds': round(elapsed, 4)}
+                for run in reversed(self.runs) for name, elapsed in run['sections']]
+
+    def milestone_rows(self):
+        # One row per milestone of every recorded run, most recent run first
+        return [{'run': run['run'], 'kind': run['kind'], 'milestone': name, 'at_seconds': round(at, 4)}
+                for run in reversed(self.runs) for name, at in run['milestones']]
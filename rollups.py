@@ -0,0 +1,126 @@
+# Pre-aggregated views of the datasets, built once per dataset version
+import pandas as pd
+
+from distinct_counts import DistinctByDay
+from line_items import SUBSCRIPTION
+from prefix_sums import PrefixSums
+from time_buckets import month_codes, month_starts
+
+# Sums kept per rollup row
+REVENUE_MEASURES = ['total_invoice_amount', 'tax', 'fee', 'net_amount']
+
+# Dimensions the Revenue page slices on, besides the day
+REVENUE_DIMENSIONS = ['is_subscription', 'description', 'currency', 'subscription_plan']
+
+# Monthly figures behind the financial page's headline cards
+FINANCIAL_MEASURES = ['total_sales', 'total_refunds', 'total_payouts', 'net_profit_loss']
+
+
+def is_subscription(revenue_df):
+    # Subscription line items, from the class normalize.py assigns per description
+    return revenue_df['line_item_class'] == SUBSCRIPTION
+
+
+def build_revenue_rollup(revenue_df):
+    """Daily revenue sums and row counts per subscription/product, description,
+    currency and subscription plan.
+
+    ``at_midnight`` marks rows created exactly at 00:00, so a range ending on
+    a day boundary can include them the way ``created <= end_date`` does.
+    """
+    df = revenue_df.dropna(subset=['created'])
+    keys = {
+        'date': df['date'],
+        'at_midnight': df['created'] == df['date'],
+        'is_subscription': is_subscription(df),
+    }
+    for column in REVENUE_DIMENSIONS[1:]:
+        if column in df.columns:
+            keys[column] = df[column]
+    measures = [column for column in REVENUE_MEASURES if column in df.columns]
+    grouped = df[measures].groupby([pd.Series(values, name=key) for key, values in keys.items()],
+                                   dropna=False, observed=True, sort=True)
+    rollup = grouped.sum()
+    rollup['rows'] = grouped.size()
+    rollup = rollup.reset_index()
+    rollup['month_code'] = month_codes(rollup['date'])
+    return rollup
+
+
+def rollup_mask(rollup, start_date, end_date):
+    # Rollup rows for ``start_date <= created <= end_date``, both at midnight
+    dates = rollup['date']
+    return (dates >= start_date) & ((dates < end_date) | ((dates == end_date) & rollup['at_midnight']))
+
+
+def rollup_range(rollup, start_date, end_date):
+    return rollup[rollup_mask(rollup, start_date, end_date)]
+
+
+def monthly_revenue(rollup, start_date, end_date):
+    """Every monthly revenue figure the Revenue page charts, from one groupby.
+
+    Returns a tidy frame with one row per scope ('range' for the selected
+    dates, 'all' for every dated row), segment ('all', 'subscription',
+    'product') and month that has rows in it, with the summed measures, the
+    row count and the month's year, 'YYYY-MM' label and 'January 2024' style
+    name. Slice it with ``monthly_slice``.
+    """
+    measures = [column for column in REVENUE_MEASURES if column in rollup.columns] + ['rows']
+    in_range = rollup_mask(rollup, start_date, end_date).rename('in_range')
+    # The one pass over the rollup; everything below combines a few dozen month rows
+    sums = rollup.groupby(['month_code', 'is_subscription', in_range])[measures].sum().reset_index()
+    parts = []
+    for scope, scoped in (('range', sums[sums['in_range']]), ('all', sums)):
+        segments = (
+            ('all', scoped),
+            ('subscription', scoped[scoped['is_subscription']]),
+            ('product', scoped[~scoped['is_subscription']]),
+        )
+        for segment, subset in segments:
+            part = subset.groupby('month_code')[measures].sum().reset_index()
+            part.insert(0, 'scope', scope)
+            part.insert(1, 'segment', segment)
+            parts.append(part)
+    monthly = pd.concat(parts, ignore_index=True)
+    starts = month_starts(monthly['month_code'])
+    monthly['year'] = starts.dt.year
+    monthly['month'] = starts.dt.strftime('%Y-%m')
+    monthly['month_name'] = starts.dt.strftime('%B %Y')
+    return monthly
+
+
+def monthly_slice(monthly, scope, segment='all'):
+    # One scope and segment of ``monthly_revenue``, in month order
+    rows = monthly[(monthly['scope'] == scope) & (monthly['segment'] == segment)]
+    return rows.drop(columns=['scope', 'segment']).reset_index(drop=True)
+
+
+def by_month_name(monthly, measure):
+    # ``measure`` per month in calendar order, labelled 'January 2024' so years never merge
+    return monthly[['year', 'month_name', measure]].rename(columns={'month_name': 'month'})
+
+
+def build_revenue_totals(revenue_df):
+    # Running totals behind the Revenue page's headline cards
+    amount = revenue_df['total_invoice_amount']
+    subscription = is_subscription(revenue_df)
+    return PrefixSums(revenue_df, 'created', {
+        'total_invoice_amount': amount,
+        'subscription_amount': amount.where(subscription, 0.0),
+        'product_amount': amount.where(~subscription, 0.0),
+        'tax': revenue_df['tax'],
+    })
+
+
+def build_financial_totals(financial_df):
+    return PrefixSums(financial_df, 'month', FINANCIAL_MEASURES)
+
+
+def build_customer_days(revenue_df, precision=None):
+    # Distinct customers per revenue day, for the Summary page's new-user counts
+    return DistinctByDay(revenue_df, 'date', 'customer_id', precision)
+
+
+def build_subscription_days(revenue_df, precision=None):
+    return DistinctByDay(revenue_df, 'date', 'subscription', precision)
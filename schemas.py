@@ -0,0 +1,94 @@
+# Schema registry for the dashboard datasets: which columns to read, their
+# dtypes, how to parse the date columns, which columns to store as categories
+# and the primary time column each dataset is sorted and range-filtered on
+import pandas as pd
+
+SCHEMAS = {
+    'revenue': {
+        'columns': [
+            'created', 'customer_id', 'email', 'phone', 'name', 'subscription', 'subscription_plan',
+            'invoice_number', 'description', 'quantity', 'currency', 'line_item_amount',
+            'total_invoice_amount', 'discount', 'fee', 'tax', 'net_amount',
+        ],
+        'dtypes': {
+            'line_item_amount': 'float64', 'total_invoice_amount': 'float64', 'discount': 'float64',
+            'fee': 'float64', 'tax': 'float64', 'net_amount': 'float64',
+        },
+        'dates': {'created': 'ISO8601'},
+        'categories': ['currency', 'subscription_plan'],
+        'time_column': 'created',
+    },
+    'customers': {
+        'columns': [
+            'id', 'created', 'name', 'email', 'phone', 'shipping_address_city', 'shipping_address_country',
+        ],
+        'dtypes': {},
+        'dates': {'created': 'ISO8601'},
+        'categories': [],
+        'time_column': 'created',
+    },
+    'subscriptions': {
+        'columns': [
+            'id', 'customer_id', 'status', 'created', 'start', 'trial_start', 'trial_end', 'canceled_at',
+        ],
+        'dtypes': {},
+        'dates': {
+            'created': 'ISO8601', 'start': 'ISO8601', 'trial_start': 'ISO8601',
+            'trial_end': 'ISO8601', 'canceled_at': 'ISO8601',
+        },
+        'categories': [],
+        'time_column': 'trial_end',
+    },
+    'payments': {
+        'columns': [
+            'id', 'amount', 'amount_refunded', 'balance_transaction_id', 'calculated_statement_descriptor',
+            'created_date', 'currency', 'customer_id', 'description', 'status', 'refunded', 'failure_code',
+        ],
+        'dtypes': {'amount': 'float64', 'amount_refunded': 'float64'},
+        'dates': {'created_date': 'ISO8601'},
+        'categories': ['currency', 'calculated_statement_descriptor'],
+        'time_column': 'created_date',
+    },
+    'financial': {
+        'columns': ['month', 'currency', 'total_sales', 'total_refunds', 'total_payouts', 'net_profit_loss'],
+        'dtypes': {
+            'total_sales': 'float64', 'total_refunds': 'float64',
+            'total_payouts': 'float64', 'net_profit_loss': 'float64',
+        },
+        'dates': {'month': 'ISO8601'},
+        'categories': ['currency'],
+        'time_column': 'month',
+    },
+}
+
+
+def read_options(name):
+    # Keyword arguments for pd.read_csv; columns missing from the file are skipped
+    schema = SCHEMAS[name]
+    columns = set(schema['columns'])
+    return {'usecols': lambda column: column in columns, 'dtype': schema['dtypes']}
+
+
+def parse_date(values, date_format=None):
+    parsed = pd.to_datetime(values, format=date_format, errors='coerce')
+    if date_format and parsed.isna().sum() > values.isna().sum():
+        # Some values did not match the declared format; fall back to inference
+        parsed = pd.to_datetime(values, errors='coerce')
+    return parsed
+
+
+def apply_schema(df, name):
+    # Parse the declared date columns and convert the categorical ones in place
+    schema = SCHEMAS[name]
+    for column, date_format in schema['dates'].items():
+        if column in df.columns:
+            df[column] = parse_date(df[column], date_format)
+    for column in schema['categories']:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    return df
+
+
+def read_dataset(source, name):
+    # Read a dataset CSV from a path or file-like object according to its schema
+    return apply_schema(pd.read_csv(source, **read_options(name)), name)
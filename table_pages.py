@@ -0,0 +1,63 @@
+# Pages of the VIEW DATA tables, cut on the server so only the visible rows
+# are sent to the browser. Sorting uses orders built once per column of the
+# full dataset (shared through the dataset store, per version); a date range
+# is a contiguous slice of the time-sorted frame, so its order is the full
+# order restricted to the slice's positions instead of a new sort.
+import numpy as np
+import pandas as pd
+
+
+def _sort_order(values, ascending):
+    # Row positions in the order sort_values(kind='stable', na_position='last') gives
+    values = pd.Series(values.to_numpy())
+    try:
+        ordered = values.sort_values(ascending=ascending, kind='stable', na_position='last')
+    except TypeError:
+        # Mixed types in an object column: order on their text
+        ordered = values.where(values.isna(), values.astype(str)).sort_values(ascending=ascending, kind='stable', na_position='last')
+    return ordered.index.to_numpy()
+
+
+class SortIndex:
+    """Sort orders of a frame's columns, each built on first use.
+
+    ``order(column, ascending, start, stop)`` gives the positions of rows
+    ``start:stop`` sorted on ``column``, relative to ``start``. Orders are only
+    ever added, so sessions can share one index.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self._orders = {}
+
+    def order(self, column, ascending=True, start=0, stop=None):
+        key = (column, ascending)
+        order = self._orders.get(key)
+        if order is None:
+            order = self._orders[key] = _sort_order(self.df[column], ascending)
+        stop = len(self.df) if stop is None else stop
+        if start == 0 and stop == len(self.df):
+            return order
+        return order[(order >= start) & (order < stop)] - start
+
+    def __sizeof__(self):
+        return object.__sizeof__(self) + sum(order.nbytes for order in self._orders.values())
+
+
+def page_count(rows, page_size):
+    return max(1, -(-rows // page_size))
+
+
+def table_page(df, page, page_size, sort_by=None, ascending=True, index=None, offset=0):
+    """Rows of page ``page`` (from 0) of ``df``, sorted on ``sort_by`` if given.
+
+    ``index`` is a SortIndex over a frame of which ``df`` is the positional
+    slice starting at ``offset`` (``df`` itself when omitted).
+    """
+    first = page * page_size
+    if sort_by is None:
+        return df.iloc[first:first + page_size]
+    if index is None:
+        index, offset = SortIndex(df), 0
+    order = index.order(sort_by, ascending, offset, offset + len(df))
+    return df.iloc[np.asarray(order[first:first + page_size])]
@@ -0,0 +1,85 @@
+# A page's computations as a graph of named tasks: intermediates every chart
+# needs are tasks of their own, computed once, and tasks that do not depend
+# on each other run at the same time on a thread pool. pandas and NumPy
+# release the GIL in most of their sorting, hashing and grouping kernels, so
+# independent aggregations overlap instead of queueing behind one another.
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class TaskGraph:
+    """Named tasks, each a function of the values of the tasks it depends on.
+
+    ``add(name, fn, *deps)`` registers ``fn(*values_of_deps)``; ``run()``
+    runs every task exactly once and yields ``(name, value)`` as each one
+    finishes. Tasks start in the order they were added once their
+    dependencies are done, so add them in the order they are wanted.
+    """
+
+    def __init__(self):
+        self._tasks = {}
+
+    def add(self, name, fn, *deps):
+        if name in self._tasks:
+            raise ValueError(f"task {name!r} added twice")
+        self._tasks[name] = (fn, deps)
+
+    def _order(self):
+        # Tasks in added order, each after its dependencies
+        order, seen = [], set()
+
+        def visit(name, path):
+            if name in seen:
+                return
+            if name in path or name not in self._tasks:
+                raise ValueError(f"task {name!r} is {'part of a cycle' if name in path else 'not defined'}")
+            for dep in self._tasks[name][1]:
+                visit(dep, path | {name})
+            seen.add(name)
+            order.append(name)
+
+        for name in self._tasks:
+            visit(name, frozenset())
+        return order
+
+    def run(self, workers=1):
+        """Yield ``(name, value)`` for every task, as tasks finish.
+
+        With ``workers`` > 0 tasks run on that many threads and must not call
+        Streamlit; dependents of a finished task are started before it is
+        yielded. With 0 workers they run in turn on the calling thread.
+        """
+        order = self._order()
+        values = {}
+        if workers <= 0:
+            for name in order:
+                fn, deps = self._tasks[name]
+                values[name] = fn(*(values[dep] for dep in deps))
+                yield name, values[name]
+            return
+
+        waiting = list(order)
+        running = {}
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='task')
+
+        def start_ready():
+            for name in [name for name in waiting if all(dep in values for dep in self._tasks[name][1])]:
+                waiting.remove(name)
+                fn, deps = self._tasks[name]
+                running[executor.submit(fn, *(values[dep] for dep in deps))] = name
+
+        try:
+            start_ready()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                finished = []
+                for future in done:
+                    name = running.pop(future)
+                    values[name] = future.result()
+                    finished.append(name)
+                start_ready()
+                for name in finished:
+                    yield name, values[name]
+        finally:
+            # Stopped early (a new rerun, or a failed task): running tasks finish
+            # in the background, those not started are dropped
+            executor.shutdown(wait=False, cancel_futures=True)
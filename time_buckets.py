@@ -0,0 +1,41 @@
+# Integer day and month codes for grouping on dates. Grouping on the codes
+# avoids formatting a string per row; labels are formatted afterwards, only
+# for the grouped rows. Missing dates get a missing (<NA>) code, so groupby
+# drops them unless asked not to, and sorts them last with ``dropna=False``.
+import numpy as np
+import pandas as pd
+
+NAT = np.iinfo('int64').min
+
+
+def _codes(dates, unit):
+    values = pd.Series(dates).to_numpy(dtype='datetime64[ns]').astype(f'datetime64[{unit}]').astype('int64')
+    return pd.Series(pd.arrays.IntegerArray(values, values == NAT), index=getattr(dates, 'index', None))
+
+
+def month_codes(dates):
+    # Months since 1970-01, in calendar order
+    return _codes(dates, 'M')
+
+
+def day_codes(dates):
+    # Days since 1970-01-01
+    return _codes(dates, 'D')
+
+
+def _starts(codes, unit):
+    values = pd.Series(codes).to_numpy(dtype='int64', na_value=NAT).astype(f'datetime64[{unit}]')
+    return pd.Series(values.astype('datetime64[ns]'), index=getattr(codes, 'index', None))
+
+
+def month_starts(codes):
+    # First day of each coded month, NaT for missing codes
+    return _starts(codes, 'M')
+
+
+def month_labels(codes, date_format='%Y-%m', missing='NaT'):
+    return month_starts(codes).dt.strftime(date_format).fillna(missing)
+
+
+def day_labels(codes, date_format='%Y-%m-%d', missing='NaT'):
+    return _starts(codes, 'D').dt.strftime(date_format).fillna(missing)
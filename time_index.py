@@ -0,0 +1,34 @@
+# Date-range lookups on frames sorted by their primary time column
+# (normalize.py sorts every dataset once per version)
+import pandas as pd
+
+
+def time_bounds(df, column, start=None, end=None, inclusive='both'):
+    """Row positions ``(lo, hi)`` of the rows with ``start <= df[column] <= end``.
+
+    Two binary searches instead of a full scan; ``df`` must be sorted on
+    ``column`` with missing dates last. ``inclusive`` is 'both', 'left',
+    'right' or 'neither', as for ``Series.between``.
+    """
+    return series_bounds(df[column], start, end, inclusive)
+
+
+def series_bounds(values, start=None, end=None, inclusive='both'):
+    # time_bounds on a sorted datetime Series (or anything with searchsorted)
+    lo = 0
+    if start is not None:
+        side = 'left' if inclusive in ('both', 'left') else 'right'
+        lo = values.searchsorted(pd.Timestamp(start), side=side)
+    if end is not None:
+        side = 'right' if inclusive in ('both', 'right') else 'left'
+        hi = values.searchsorted(pd.Timestamp(end), side=side)
+    else:
+        # Missing dates sort after every real one and never fall in a range
+        hi = values.searchsorted(pd.Timestamp.max, side='right')
+    return int(lo), int(max(lo, hi))
+
+
+def time_slice(df, column, start=None, end=None, inclusive='both'):
+    # The matching rows as a positional slice of ``df``, without building a mask
+    lo, hi = time_bounds(df, column, start, end, inclusive)
+    return df.iloc[lo:hi]